@@ -19,7 +19,9 @@ import uuid
 from pathlib import Path
 
 import chess
-import chess.pgn
+
+from progress_cache import load_progress, remember_progress
+from response_schemas import moves_to_pgn_string
 
 
 def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path):
@@ -35,24 +37,42 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
     import sys
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
-    from scripts.openings import OpeningsDB
+    from scripts.openings import OpeningsDB, pack_move, resolve_trie_path
 
     db_path = data_dir / "openings.db"
-    trie_path = data_dir / "openings_trie.json"
+    trie_path = data_dir / "openings_trie.bin"
+
+    _db_cache: dict = {"instance": None, "trie_key": None}
 
     def _get_openings_db():
-        """Get OpeningsDB instance, returning None if files don't exist."""
-        if not db_path.exists() or not trie_path.exists():
+        """Get OpeningsDB instance, returning None if files don't exist.
+
+        The instance is built once and reused across tool calls so the trie
+        is only loaded once per server lifetime. It is rebuilt when the trie
+        file or its mtime changes (i.e. the database was rebuilt on disk).
+        """
+        if not db_path.exists():
+            return None
+        # Falls back to a pre-packed-format openings_trie.json
+        current_trie = resolve_trie_path(str(trie_path))
+        try:
+            trie_key = (current_trie, os.stat(current_trie).st_mtime_ns)
+        except OSError:
             return None
-        return OpeningsDB(str(db_path), str(trie_path))
 
+        instance = _db_cache["instance"]
+        if instance is None or _db_cache["trie_key"] != trie_key:
+            instance = OpeningsDB(str(db_path), current_trie)
+            _db_cache["instance"] = instance
+            _db_cache["trie_key"] = trie_key
+        return instance
+
+    # Returned as-is: responses are serialized immediately and never mutated.
     _DB_NOT_BUILT_ERROR = {
         "error": "Openings database not built. Run: uv run python scripts/build_openings_db.py"
     }
 
-    # Import server helpers for set_position and _sync_game_json
-    from scripts.engine import ChessEngine
-    from scripts.models import GameState
+    from scripts.models import GameRecord
 
     @mcp.tool()
     def identify_opening(game_id: str) -> dict:
@@ -74,12 +94,19 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
 
         openings_db = _get_openings_db()
         if openings_db is None:
-            return dict(_DB_NOT_BUILT_ERROR)
-
-        board: chess.Board = game["board"]
-        uci_moves = [m.uci() for m in board.move_stack]
-
-        result = openings_db.identify_opening(uci_moves)
+            return _DB_NOT_BUILT_ERROR
+
+        # Server games keep the packed keys up to date move by move. This
+        # tool runs on the event loop, so it must not wait on game.lock
+        # while a search holds it; it works from snapshots instead, and
+        # rebuilds the keys if a move landed between the two copies.
+        move_stack = list(game.board.move_stack)
+        move_keys = game.move_keys
+        move_keys = list(move_keys) if move_keys is not None else None
+        if move_keys is None or len(move_keys) != len(move_stack):
+            move_keys = [pack_move(m) for m in move_stack]
+
+        result = openings_db.identify_opening_keys(move_keys)
         if result is None:
             return {"opening": None, "message": "Position is out of book"}
 
@@ -111,7 +138,7 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
         """
         openings_db = _get_openings_db()
         if openings_db is None:
-            return dict(_DB_NOT_BUILT_ERROR)
+            return _DB_NOT_BUILT_ERROR
 
         results = openings_db.search_openings(
             query, eco=eco, eco_volume=eco_volume, limit=limit
@@ -130,7 +157,7 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
         """
         openings_db = _get_openings_db()
         if openings_db is None:
-            return dict(_DB_NOT_BUILT_ERROR)
+            return _DB_NOT_BUILT_ERROR
 
         openings = openings_db.get_opening_by_eco(eco)
         if not openings:
@@ -157,61 +184,28 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
         """
         openings_db = _get_openings_db()
         if openings_db is None:
-            return dict(_DB_NOT_BUILT_ERROR)
+            return _DB_NOT_BUILT_ERROR
 
         # Read elo from progress.json if not provided
         if elo is None:
-            progress_path = data_dir / "progress.json"
-            try:
-                if progress_path.exists():
-                    progress = json.loads(
-                        progress_path.read_text(encoding="utf-8")
-                    )
-                    elo = progress.get(
-                        "estimated_elo", progress.get("current_elo", 400)
-                    )
-                else:
-                    elo = 400
-            except (json.JSONDecodeError, OSError):
-                elo = 400
-
-        all_openings = openings_db.get_openings_for_level(elo)
-        if not all_openings:
-            return {"suggestions": []}
-
-        # Filter by color preference:
-        # White openings start with e2e4, d2d4, c2c4, etc.
-        # Black openings are responses (2nd move onwards)
-        # Simple heuristic: for white, pick openings where white moves first;
-        # for black, pick openings that are responses to common white openings
+            progress = load_progress(data_dir / "progress.json")
+            elo = progress.get("estimated_elo", progress.get("current_elo", 400))
+
+        # Color filtering happens in SQL; rows are pulled lazily and the
+        # scan stops once 10 distinct families have been collected
         suggestions = []
         seen_families = set()
 
-        for opening in all_openings:
+        for opening in openings_db.iter_openings_for_level(elo, color=color):
             family = opening.get("family", "")
             if family in seen_families:
                 continue
-
-            pgn = opening.get("pgn", "")
-            # Basic color filter: white openings typically named after first move
-            # Black openings are "Defense" or responses
-            is_defense = "defense" in family.lower() or "defence" in family.lower()
-            if color == "white" and is_defense:
-                continue
-            if color == "black" and not is_defense and "gambit" not in family.lower():
-                # For black, include defenses and gambit responses
-                # But also include Indian, Sicilian, etc.
-                if not any(
-                    kw in family.lower()
-                    for kw in ["indian", "sicilian", "french", "caro", "dutch", "benoni", "pirc", "alekhine", "scandinavian", "philidor", "petrov"]
-                ):
-                    continue
-
             seen_families.add(family)
+
             suggestions.append({
                 "name": opening["name"],
                 "eco": opening["eco"],
-                "pgn": pgn,
+                "pgn": opening.get("pgn", ""),
             })
 
             if len(suggestions) >= 10:
@@ -239,7 +233,7 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
         """
         openings_db = _get_openings_db()
         if openings_db is None:
-            return dict(_DB_NOT_BUILT_ERROR)
+            return _DB_NOT_BUILT_ERROR
 
         # Determine move range by difficulty
         if difficulty == "beginner":
@@ -249,18 +243,12 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
         else:
             max_moves = None
 
-        # Load progress for openings_studied tracking
+        # Load progress for openings_studied tracking (copied: it is updated below)
         progress_path = data_dir / "progress.json"
-        progress = {}
-        try:
-            if progress_path.exists():
-                progress = json.loads(
-                    progress_path.read_text(encoding="utf-8")
-                )
-        except (json.JSONDecodeError, OSError):
-            progress = {}
+        progress = dict(load_progress(progress_path))
 
-        openings_studied = progress.get("openings_studied", [])
+        openings_studied = list(progress.get("openings_studied", []))
+        studied_set = set(openings_studied)
 
         # Pick an opening
         opening = None
@@ -270,60 +258,52 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
                 # Filter out already studied
                 unstudied = [
                     o for o in candidates
-                    if o["name"] not in openings_studied
+                    if o["name"] not in studied_set
                 ]
                 if not unstudied:
                     # Reset studied list for this eco
+                    candidate_names = {c["name"] for c in candidates}
                     openings_studied = [
                         s for s in openings_studied
-                        if not any(c["name"] == s for c in candidates)
+                        if s not in candidate_names
                     ]
                     unstudied = candidates
                 opening = random.choice(unstudied)
         else:
-            # Get random opening with move constraints
-            for _ in range(20):  # Try up to 20 times to find unstudied
-                candidate = openings_db.get_random_opening(
-                    max_moves=max_moves
-                )
-                if candidate and candidate["name"] not in openings_studied:
-                    opening = candidate
-                    break
-            if opening is None:
-                # Reset and try once more
+            # Draw one shuffled batch and take the first unstudied opening
+            candidates = openings_db.get_random_openings(
+                max_moves=max_moves, limit=32
+            )
+            opening = next(
+                (c for c in candidates if c["name"] not in studied_set), None
+            )
+            if opening is None and candidates:
+                # Everything drawn was studied: reset and take the first
                 openings_studied = []
-                opening = openings_db.get_random_opening(
-                    max_moves=max_moves
-                )
+                opening = candidates[0]
 
         if opening is None:
             return {"error": "No suitable opening found for quiz"}
 
-        # Parse the opening PGN to get moves
-        pgn_text = opening.get("pgn", "")
-        if not pgn_text:
-            return {"error": "Opening has no PGN data"}
-
-        # Parse PGN moves using python-chess
-        import io
-        game_pgn = chess.pgn.read_game(io.StringIO(f"[Result \"*\"]\n{pgn_text} *"))
-        if game_pgn is None:
-            return {"error": "Failed to parse opening PGN"}
+        # Use the UCI move list the DB builder already derived from the PGN,
+        # so no PGN has to be re-parsed per quiz
+        uci_text = opening.get("uci", "")
+        if not uci_text:
+            return {"error": "Opening has no move data"}
+        try:
+            moves = [chess.Move.from_uci(u) for u in uci_text.split()]
+        except ValueError:
+            return {"error": "Failed to parse opening moves"}
 
-        moves = list(game_pgn.mainline_moves())
         if len(moves) < 2:
             return {"error": "Opening too short for quiz"}
 
         # Play N-1 moves, quiz on the Nth
         quiz_move_idx = min(len(moves) - 1, random.randint(1, len(moves) - 1))
         board = chess.Board()
-        moves_so_far = []
-
-        for i, m in enumerate(moves):
-            if i >= quiz_move_idx:
-                break
-            moves_so_far.append(board.san(m))
-            board.push(m)
+        # san_and_push formats and plays in one step; san() followed by
+        # push() would make and unmake each move an extra time
+        moves_so_far = [board.san_and_push(m) for m in moves[:quiz_move_idx]]
 
         # The correct move is the next one
         correct_move = moves[quiz_move_idx]
@@ -332,37 +312,42 @@ def register_openings_tools(mcp, games: dict, data_dir: Path, project_root: Path
 
         # Create a real game via set_position pattern
         game_id = str(uuid.uuid4())
-        engine = ChessEngine()
-        engine.set_difficulty(3000)
         player_color = "white" if board.turn == chess.WHITE else "black"
 
-        quiz_game = {
-            "engine": engine,
-            "board": board.copy(),
-            "player_color": player_color,
-            "target_elo": 3000,
-            "starting_fen": position_fen,
-            "eval_score": None,
-            "accuracy": {"white": 0.0, "black": 0.0},
-            "session_number": 1,
-            "streak": 0,
-            "lesson_name": f"Opening Quiz: {opening['name']}",
-            "move_evals": [],
-        }
+        quiz_game = GameRecord(
+            board=board,
+            player_color=player_color,
+            target_elo=3000,
+            # The board carries the book moves, so its root is the start
+            starting_fen=chess.STARTING_FEN,
+            # Started on first use by the server's _get_engine; most quizzes
+            # are answered without ever needing Stockfish
+            engine=None,
+            lesson_name=f"Opening Quiz: {opening['name']}",
+            # Seeded from the book moves just played, so the first
+            # get_board doesn't replay them to rebuild the same lists
+            san_list=list(moves_so_far),
+            pgn_str=moves_to_pgn_string(moves_so_far),
+            move_keys=[pack_move(m) for m in moves[:quiz_move_idx]],
+        )
         games[game_id] = quiz_game
 
         # Track studied opening
         openings_studied.append(opening["name"])
         progress["openings_studied"] = openings_studied
 
-        # Write progress atomically
+        # Write progress atomically; fsync so the rename can't land first
         data_dir.mkdir(parents=True, exist_ok=True)
         tmp = data_dir / "progress.json.tmp"
-        tmp.write_text(
-            json.dumps(progress, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # One dumps() and write: json.dump would encode through the
+            # chunked iterencode path and write each fragment separately
+            f.write(json.dumps(progress, indent=2, ensure_ascii=False))
+            f.flush()
+            os.fsync(f.fileno())
         os.replace(tmp, progress_path)
+        remember_progress(progress_path, progress)
 
         return {
             "game_id": game_id,
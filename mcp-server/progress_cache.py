@@ -0,0 +1,65 @@
+"""Cached reads of data/progress.json for the MCP server.
+
+progress.json is read by several tools (opening suggestions and quizzes,
+PGN auto-save, session saves) but only changes when a session or quiz is
+saved. The parsed dict is kept in process and reused while the file's
+mtime and size are unchanged; any rewrite, ours or external, changes that
+key and forces a fresh parse.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+# Parsed progress.json, reused while the file's mtime and size are unchanged.
+_progress_cache: dict = {"path": None, "key": None, "data": {}}
+
+
+def load_progress(progress_path: Path) -> dict:
+    """Load progress.json, reusing the last parse if the file is unchanged.
+
+    The returned dict is shared with the cache; callers must copy it
+    before mutating.
+
+    Args:
+        progress_path: Path to progress.json.
+
+    Returns:
+        Parsed progress dict, or an empty dict if missing or unreadable.
+    """
+    try:
+        st = os.stat(progress_path)
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    if _progress_cache["path"] == progress_path and _progress_cache["key"] == key:
+        return _progress_cache["data"]
+
+    try:
+        data = json.loads(Path(progress_path).read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return {}
+    _progress_cache.update(path=progress_path, key=key, data=data)
+    return data
+
+
+def remember_progress(progress_path: Path, data: dict) -> None:
+    """Record a dict just written to progress.json as the cached parse.
+
+    Called by writers right after replacing the file, so the next
+    load_progress() reuses data instead of re-reading what was just written.
+    The cache takes ownership of data; callers must not mutate it afterwards.
+
+    Args:
+        progress_path: Path to progress.json.
+        data: The dict that was serialized into the file.
+    """
+    try:
+        st = os.stat(progress_path)
+    except OSError:
+        return
+    _progress_cache.update(
+        path=progress_path, key=(st.st_mtime_ns, st.st_size), data=data,
+    )
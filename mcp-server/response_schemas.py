@@ -9,49 +9,70 @@ PGN string format for move_list uses standard chess notation
 
 from __future__ import annotations
 
+import operator
 import os
 
+# Schema validation is a debugging aid; the env var is read once at import.
+_VALIDATE_ENABLED = os.environ.get("CHESS_SPEEDRUN_VALIDATE") == "1"
+_NO_ERRORS: list[str] = []
+
 
 # ---------------------------------------------------------------------------
 # Minification functions
 # ---------------------------------------------------------------------------
 
+# GameState fields passed through to the minified response unchanged
+_GAME_STATE_CORE_KEYS = (
+    "game_id", "fen", "last_move", "last_move_san", "eval_score",
+    "player_color", "target_elo", "is_game_over", "result",
+)
+
+# MoveEvaluation fields passed through to the minified response unchanged
+_EVALUATION_KEYS = (
+    "move_san", "best_move_san", "cp_loss", "eval_before",
+    "eval_after", "classification", "is_book",
+)
+_get_evaluation_fields = operator.itemgetter(*_EVALUATION_KEYS)
+
 
 def minify_game_state(state: dict) -> dict:
     """Minify a GameState dict for MCP response.
 
-    Removes fields the LLM doesn't need, compacts move_list to PGN string,
-    replaces legal_moves list with count, simplifies accuracy and opening.
+    Removes fields the LLM doesn't need, compacts move_list to PGN string
+    (using move_list_pgn when the state carries it), replaces legal_moves
+    list with count (legal_moves_count when the state carries it),
+    simplifies accuracy and opening.
 
     Args:
-        state: Full GameState dict (as produced by _build_game_state).
+        state: Full GameState dict (as produced by _build_game_state);
+            all core fields must be present.
 
     Returns:
         Minified dict with reduced token footprint.
     """
-    result = {}
-
-    # Keep core fields as-is
-    for key in (
-        "game_id", "fen", "last_move", "last_move_san", "eval_score",
-        "player_color", "target_elo", "is_game_over", "result",
-    ):
-        if key in state:
-            result[key] = state[key]
+    # Keep core fields as-is (always present in a GameState dict)
+    result = {key: state[key] for key in _GAME_STATE_CORE_KEYS}
 
-    # Compact move_list: JSON array -> PGN string
+    # Compact move_list: JSON array -> PGN string (prefer the server's
+    # incrementally maintained copy over rebuilding it from the list)
+    move_list_pgn = state.get("move_list_pgn")
     move_list = state.get("move_list", [])
-    if isinstance(move_list, list):
-        result["move_list"] = _moves_to_pgn_string(move_list)
+    if move_list_pgn is not None:
+        result["move_list"] = move_list_pgn
+    elif isinstance(move_list, list):
+        result["move_list"] = moves_to_pgn_string(move_list)
     else:
         result["move_list"] = move_list
 
-    # Replace legal_moves list with count
-    legal_moves = state.get("legal_moves", [])
-    if isinstance(legal_moves, list):
-        result["legal_moves_count"] = len(legal_moves)
-    else:
-        result["legal_moves_count"] = 0
+    # Replace legal_moves list with count (the server's states carry it)
+    legal_moves_count = state.get("legal_moves_count")
+    if legal_moves_count is None:
+        legal_moves = state.get("legal_moves", [])
+        if isinstance(legal_moves, list):
+            legal_moves_count = len(legal_moves)
+        else:
+            legal_moves_count = 0
+    result["legal_moves_count"] = legal_moves_count
 
     # Simplify accuracy: dict -> single float (player's color only)
     accuracy = state.get("accuracy", {"white": 0.0, "black": 0.0})
@@ -80,29 +101,26 @@ def minify_move_evaluation(evaluation: dict) -> dict:
     """Minify a MoveEvaluation dict for MCP response.
 
     Removes tactical_motif (always None) and is_best (redundant with
-    cp_loss == 0). Truncates best_line to first 3 moves.
+    cp_loss == 0). Truncates best_line to first 3 moves, in place.
 
     Args:
-        evaluation: Full MoveEvaluation dict (from dataclasses.asdict).
+        evaluation: Full MoveEvaluation dict (from MoveEvaluation.to_dict).
 
     Returns:
         Minified dict.
     """
-    result = {}
-
-    for key in (
-        "move_san", "best_move_san", "cp_loss", "eval_before",
-        "eval_after", "classification",
-    ):
-        if key in evaluation:
-            result[key] = evaluation[key]
-
-    # Truncate best_line to first 3 moves
+    try:
+        result = dict(zip(_EVALUATION_KEYS, _get_evaluation_fields(evaluation)))
+    except KeyError:
+        # Partial evaluation dict: copy whichever fields are present
+        result = {key: evaluation[key] for key in _EVALUATION_KEYS if key in evaluation}
+
+    # Truncate best_line to first 3 moves (in place: the list belongs to
+    # a throwaway MoveEvaluation, so no slice copy is needed)
     best_line = evaluation.get("best_line", [])
     if isinstance(best_line, list):
-        result["best_line"] = best_line[:3]
-    else:
-        result["best_line"] = best_line
+        del best_line[3:]
+    result["best_line"] = best_line
 
     # Removed fields: tactical_motif, is_best
 
@@ -112,7 +130,7 @@ def minify_move_evaluation(evaluation: dict) -> dict:
 def minify_analysis(analysis: dict) -> dict:
     """Minify an analysis response dict for MCP response.
 
-    Truncates PV moves to 5 per line, removes null mate_in keys.
+    Truncates PV moves to 5 per line (in place), removes null mate_in keys.
 
     Args:
         analysis: Full analysis dict with fen, depth, lines.
@@ -133,12 +151,11 @@ def minify_analysis(analysis: dict) -> dict:
             "score_cp": line.get("score_cp"),
         }
 
-        # Truncate moves to 5
+        # Truncate moves to 5 (in place: analysis lines are built per call)
         moves = line.get("moves", [])
         if isinstance(moves, list):
-            ml["moves"] = moves[:5]
-        else:
-            ml["moves"] = moves
+            del moves[5:]
+        ml["moves"] = moves
 
         # Only include mate_in when not None
         mate_in = line.get("mate_in")
@@ -185,7 +202,7 @@ def minify_save_session(response: dict) -> dict:
 # ---------------------------------------------------------------------------
 
 
-def _moves_to_pgn_string(moves: list[str]) -> str:
+def moves_to_pgn_string(moves: list[str]) -> str:
     """Convert a list of SAN moves to a PGN move string.
 
     E.g., ['e4', 'e5', 'Nf3', 'Nc6'] -> '1.e4 e5 2.Nf3 Nc6'
@@ -196,22 +213,46 @@ def _moves_to_pgn_string(moves: list[str]) -> str:
     Returns:
         PGN-formatted move string.
     """
-    if not moves:
-        return ""
-
-    parts = []
-    for i, move in enumerate(moves):
-        if i % 2 == 0:
-            # White's move — prepend move number
-            move_num = i // 2 + 1
-            parts.append(f"{move_num}.{move}")
-        else:
-            # Black's move
-            parts.append(move)
+    white_moves = moves[::2]
+    black_moves = moves[1::2]
+    parts = [
+        f"{num}.{white} {black}"
+        for num, (white, black) in enumerate(zip(white_moves, black_moves), 1)
+    ]
+    if len(white_moves) > len(black_moves):
+        # Trailing White move with no reply yet
+        parts.append(f"{len(white_moves)}.{white_moves[-1]}")
 
     return " ".join(parts)
 
 
+def append_pgn_move(pgn: str, ply: int, san: str) -> str:
+    """Append one SAN move to a PGN move string built by moves_to_pgn_string.
+
+    Args:
+        pgn: Existing PGN move string (may be empty).
+        ply: Zero-based index of the new move in the move list.
+        san: SAN of the move being appended.
+
+    Returns:
+        PGN move string including the new move.
+    """
+    token = f"{ply // 2 + 1}.{san}" if ply % 2 == 0 else san
+    return f"{pgn} {token}" if pgn else token
+
+
+def drop_last_pgn_move(pgn: str) -> str:
+    """Remove the last move from a PGN move string built by moves_to_pgn_string.
+
+    Args:
+        pgn: PGN move string.
+
+    Returns:
+        PGN move string without its final move.
+    """
+    return pgn[:max(pgn.rfind(" "), 0)]
+
+
 # ---------------------------------------------------------------------------
 # Validation schemas (dict-based)
 # ---------------------------------------------------------------------------
@@ -239,6 +280,7 @@ MOVE_EVALUATION_SCHEMA = {
     "eval_before": (int, float),
     "eval_after": (int, float),
     "classification": str,
+    "is_book": bool,
     "best_line": list,
 }
 
@@ -256,7 +298,9 @@ ERROR_SCHEMA = {
 def validate_response(response: dict, schema: dict) -> list[str]:
     """Validate a response dict against a schema.
 
-    Only runs when CHESS_SPEEDRUN_VALIDATE=1 env var is set.
+    Only runs when CHESS_SPEEDRUN_VALIDATE=1 env var is set (read once at
+    import). When disabled, returns a shared empty list that callers must
+    not mutate.
 
     Args:
         response: Response dict to validate.
@@ -265,8 +309,8 @@ def validate_response(response: dict, schema: dict) -> list[str]:
     Returns:
         List of validation error strings (empty = valid).
     """
-    if os.environ.get("CHESS_SPEEDRUN_VALIDATE") != "1":
-        return []
+    if not _VALIDATE_ENABLED:
+        return _NO_ERRORS
 
     errors = []
 
@@ -2,16 +2,25 @@
 
 Exposes Stockfish chess tools to Claude Code via FastMCP.
 Games are stored in memory keyed by UUID. Board state is synced
-to data/current_game.json after every move for dashboard consumption.
+to data/current_game.json after every move for dashboard consumption
+(bursts of moves are coalesced into one trailing write).
 """
 
 from __future__ import annotations
 
+import asyncio
+import errno
+import functools
+import hashlib
 import json
 import os
+import random
+import re
 import sys
+import threading
+import time
 import uuid
-from dataclasses import asdict
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -26,22 +35,26 @@ import chess.pgn
 from mcp.server.fastmcp import FastMCP
 
 from scripts.engine import ChessEngine
-from scripts.models import GameState, MoveEvaluation
-from scripts.openings import OpeningsDB
+from scripts.models import GameRecord, MoveEvaluation
+from scripts.openings import OpeningsDB, pack_move
 from scripts.srs import SRSManager
 
 from openings_tools import register_openings_tools  # noqa: E402
+from progress_cache import load_progress, remember_progress  # noqa: E402
 from response_schemas import (  # noqa: E402
+    append_pgn_move,
+    drop_last_pgn_move,
     minify_analysis,
     minify_game_state,
     minify_move_evaluation,
     minify_save_session,
+    moves_to_pgn_string,
 )
 
 mcp = FastMCP("chess-speedrun")
 
-# In-memory game store: game_id -> {engine, board, metadata}
-_games: dict[str, dict] = {}
+# In-memory game store: game_id -> GameRecord (engine, board, metadata)
+_games: dict[str, GameRecord] = {}
 
 _DATA_DIR = _PROJECT_ROOT / "data"
 
@@ -50,6 +63,65 @@ _openings_db = OpeningsDB()
 
 register_openings_tools(mcp, _games, _DATA_DIR, _PROJECT_ROOT)
 
+# SAN of every legal move, keyed by board._transposition_key() (piece
+# placement, side to move, castling rights, en passant square). Bounded LRU.
+_LEGAL_SANS_MAX = 256
+_legal_sans_cache: OrderedDict[tuple, list[str]] = OrderedDict()
+_legal_sans_lock = threading.Lock()
+
+# Puzzle count and FEN-key index (see _fen_key) of puzzles/from-games.json,
+# reused while the file's mtime and size are unchanged; see _load_game_puzzles
+_game_puzzles_cache: dict = {"path": None, "key": None, "count": 0, "fens": frozenset()}
+# Held from reading the index to writing the file, so two games mined at
+# once cannot both append the same puzzle or overwrite each other's
+_game_puzzles_lock = threading.Lock()
+
+# Shared full-strength engine for analysis tools; see _get_analysis_engine
+_analysis_engine: ChessEngine | None = None
+_analysis_lock = threading.RLock()
+_ANALYSIS_HASH_MB = 256
+_ANALYSIS_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+# Engines used to evaluate a finished game's moves in parallel: the shared
+# analysis engine plus single-threaded helpers, kept warm between calls;
+# see _evaluate_moves_parallel
+_PUZZLE_EVAL_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+_helper_engines: list[ChessEngine] = []
+
+# Copy/write buffer for rewriting puzzles/from-games.json
+_PUZZLE_WRITE_BUFSIZE = 1 << 20
+
+# Last current_game.json write: hash of the JSON text, the (mtime, size)
+# it left on disk (so identical re-syncs can be skipped) and when it ran.
+_last_sync: dict = {"digest": None, "stat": None, "time": float("-inf")}
+
+# States arriving within _SYNC_DEBOUNCE_S of the last write are parked and
+# written once by a timer; see _schedule_sync
+_SYNC_DEBOUNCE_S = 0.05
+_pending_sync: dict = {"state": None, "timer": None}
+_sync_lock = threading.RLock()
+
+# Shared SRS card store and the (mtime, size) of its file when last
+# loaded or saved by us; see _get_srs
+_srs_cache: dict = {"manager": None, "key": None}
+_srs_lock = threading.RLock()
+
+# Built once: json.dumps() with keyword arguments constructs a fresh
+# JSONEncoder on every call. Compact separators keep encoding on the C
+# encoder; indent= would force the pure-Python one.
+_GAME_STATE_ENCODER = json.JSONEncoder(
+    separators=(",", ":"), ensure_ascii=False, default=str,
+)
+
+
+# Moves losing at most this many centipawns count as accurate
+_GOOD_MOVE_MAX_CP_LOSS = 30
+
+# Lowest target Elo at which engine_move replies from the opening book.
+# From here ChessEngine plays full Stockfish under UCI_Elo, which follows
+# main lines anyway; below it, it blends in random and shallow moves that
+# a book reply would make stronger than the setting.
+_BOOK_MIN_ELO = 1320
 
 _PIECE_VALUES = {
     chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3,
@@ -67,6 +139,68 @@ _STARTING_PIECES = {
 }
 
 
+def _board_display(fen: str) -> str:
+    """Render the ASCII diagram str(board) would give, from a FEN alone.
+
+    Expands the placement field rank by rank, so no board is needed.
+
+    Args:
+        fen: FEN string (only the piece placement field is read).
+
+    Returns:
+        Eight space-separated rows, rank 8 first, with "." for empty squares.
+    """
+    placement = fen.split(" ", 1)[0]
+    rows = []
+    for rank in placement.split("/"):
+        squares = []
+        for ch in rank:
+            if ch.isdigit():
+                squares.extend("." * int(ch))
+            else:
+                squares.append(ch)
+        rows.append(" ".join(squares))
+    return "\n".join(rows)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_fen(fen: str) -> chess.Board | str:
+    """Parse and validate a FEN once per distinct string.
+
+    Puzzle and analysis workflows pass the same FENs again and again;
+    each is parsed and run through is_valid() only the first time.
+
+    Args:
+        fen: FEN string from a tool caller.
+
+    Returns:
+        The parsed board, shared with the cache and never to be mutated
+        (see _board_from_fen), or an error message.
+    """
+    try:
+        board = chess.Board(fen)
+    except ValueError as exc:
+        return f"Invalid FEN: {exc}"
+    if not board.is_valid():
+        return f"Invalid FEN position: {fen}"
+    return board
+
+
+def _board_from_fen(fen: str) -> chess.Board | dict:
+    """Return a fresh board for a validated FEN.
+
+    Args:
+        fen: FEN string from a tool caller.
+
+    Returns:
+        A private copy of the parsed board, or an error dict.
+    """
+    parsed = _parse_fen(fen)
+    if isinstance(parsed, str):
+        return {"error": parsed}
+    return parsed.copy()
+
+
 def _count_material(board: chess.Board) -> dict:
     """Count material value for each side (excludes kings)."""
     material = {"white": 0, "black": 0}
@@ -101,23 +235,152 @@ def _get_captured_pieces(board: chess.Board) -> dict:
     return captured
 
 
-def _build_move_annotations(game: dict) -> list[dict]:
-    """Build move annotation list from stored move_evals."""
-    annotations = []
-    for ev in game.get("move_evals", []):
-        annotations.append({
-            "move": ev.get("move_san", ""),
-            "classification": ev.get("classification", ""),
-            "cp_loss": ev.get("cp_loss", 0),
-            "ply": ev.get("ply", 0),
-            "color": ev.get("color", "white"),
-        })
-    return annotations
+def _build_move_annotations(game: GameRecord) -> list[dict]:
+    """Build move annotation list from stored move_evals.
 
+    evaluate_move stores each eval in annotation form, so the records
+    themselves are shared (they are never mutated once stored); only the
+    list is copied, as move_evals keeps changing after this snapshot.
+    """
+    return list(game.move_evals)
+
+
+def _legal_sans(board: chess.Board) -> list[str]:
+    """Return the SAN of every legal move, memoized per position.
+
+    The returned list is shared with the cache; callers must not mutate it.
+
+    Args:
+        board: Position to list moves for.
+
+    Returns:
+        List of SAN strings in legal-move generation order.
+    """
+    key = board._transposition_key()
+    with _legal_sans_lock:
+        sans = _legal_sans_cache.get(key)
+        if sans is not None:
+            _legal_sans_cache.move_to_end(key)
+            return sans
+
+    sans = [board.san(m) for m in board.legal_moves]
+    with _legal_sans_lock:
+        _legal_sans_cache[key] = sans
+        if len(_legal_sans_cache) > _LEGAL_SANS_MAX:
+            _legal_sans_cache.popitem(last=False)
+    return sans
+
+
+def _replay_san_list(game: GameRecord) -> list[str]:
+    """Replay the game's move stack from its starting position as SAN.
+
+    Args:
+        game: Internal game record.
+
+    Returns:
+        List of SAN strings, one per ply.
+    """
+    board = game.board
+    # root() restores the start position from the move stack, without
+    # re-parsing the starting FEN
+    temp = board.root()
+    return [temp.san_and_push(m) for m in board.move_stack]
 
-def _build_game_state(game_id: str, game: dict) -> dict:
+
+def _get_move_keys(game: GameRecord) -> list[int]:
+    """Return the record's packed move keys, seeding them on first use.
+
+    Args:
+        game: Internal game record.
+
+    Returns:
+        One pack_move() key per ply, kept in step by _push_move/_pop_move.
+    """
+    if game.move_keys is None:
+        game.move_keys = [pack_move(m) for m in game.board.move_stack]
+    return game.move_keys
+
+
+def _book_moves(game: GameRecord) -> list[tuple[chess.Move, int]]:
+    """List opening-book continuations for the game's current position.
+
+    The book is keyed by moves from the standard start, so games set up
+    from a custom FEN are always out of book.
+
+    Args:
+        game: Internal game record.
+
+    Returns:
+        (move, line_count) pairs, most popular first; empty when out of book.
+    """
+    if game.starting_fen != chess.STARTING_FEN:
+        return []
+    board = game.board
+    return [
+        (move, lines)
+        for move, lines in (
+            (chess.Move.from_uci(uci), lines)
+            for uci, lines in _openings_db.book_moves(_get_move_keys(game))
+        )
+        if board.is_legal(move)
+    ]
+
+
+def _push_move(game: GameRecord, move: chess.Move) -> None:
+    """Push a move onto the game's board, keeping its move caches in step.
+
+    Args:
+        game: Internal game record.
+        move: Legal move to play.
+    """
+    board: chess.Board = game.board
+    ply = len(board.move_stack)
+    # san_and_push plays the move once to find check/mate suffixes;
+    # san() followed by push() would play it twice
+    san = board.san_and_push(move)
+    san_list = game.san_list
+    if san_list is not None:
+        san_list.append(san)
+    pgn_str = game.pgn_str
+    if pgn_str is not None:
+        game.pgn_str = append_pgn_move(pgn_str, ply, san)
+    move_keys = game.move_keys
+    if move_keys is not None:
+        move_keys.append(pack_move(move))
+    game.state_cache = None
+    game.opening_match = None
+
+
+def _pop_move(game: GameRecord) -> chess.Move:
+    """Pop the last move off the game's board, keeping its move caches in step.
+
+    Args:
+        game: Internal game record with at least one move played.
+
+    Returns:
+        The move that was undone.
+    """
+    move = game.board.pop()
+    san_list = game.san_list
+    if san_list:
+        san_list.pop()
+    pgn_str = game.pgn_str
+    if pgn_str is not None:
+        game.pgn_str = drop_last_pgn_move(pgn_str)
+    move_keys = game.move_keys
+    if move_keys:
+        move_keys.pop()
+    game.state_cache = None
+    game.opening_match = None
+    return move
+
+
+def _build_game_state(game_id: str, game: GameRecord) -> dict:
     """Build a GameState dict from the in-memory game record.
 
+    The result is also kept as game.state_cache until the board or a
+    displayed setting changes (see _get_game_state).
+
     Args:
         game_id: UUID of the game.
         game: Internal game record with engine, board, metadata.
@@ -125,33 +388,41 @@ def _build_game_state(game_id: str, game: dict) -> dict:
     Returns:
         Dict representation of GameState.
     """
-    board: chess.Board = game["board"]
-    move_list = []
-    temp = chess.Board(game["starting_fen"])
-    for m in board.move_stack:
-        move_list.append(temp.san(m))
-        temp.push(m)
+    board: chess.Board = game.board
+
+    # The SAN move list and PGN text are maintained incrementally by
+    # _push_move/_pop_move; seed them by replay the first time a game
+    # without them is built.
+    move_list = game.san_list
+    if move_list is None:
+        move_list = game.san_list = _replay_san_list(game)
+    pgn_str = game.pgn_str
+    if pgn_str is None:
+        pgn_str = game.pgn_str = moves_to_pgn_string(move_list)
 
     last_move = None
     last_move_san = None
     if board.move_stack:
-        last_uci = board.move_stack[-1]
-        last_move = last_uci.uci()
-        temp2 = board.copy()
-        temp2.pop()
-        last_move_san = temp2.san(last_uci)
-
-    legal_moves = [board.san(m) for m in board.legal_moves]
+        last_move = board.move_stack[-1].uci()
+        last_move_san = move_list[-1]
 
-    result = None
-    if board.is_game_over():
-        result = board.result()
+    # One outcome() call answers game over, result, checkmate and
+    # stalemate; each of those board predicates would regenerate moves
+    outcome = board.outcome()
+    result = outcome.result() if outcome is not None else None
+    termination = outcome.termination if outcome is not None else None
 
-    # Identify current opening from move sequence (trie lookup, O(d))
+    # Identify current opening from move sequence (trie lookup, O(d)).
+    # The match is kept on the record until _push_move/_pop_move drop it.
     current_opening = None
-    uci_moves = [m.uci() for m in board.move_stack]
-    if uci_moves:
-        match = _openings_db.identify_opening(uci_moves)
+    if board.move_stack:
+        ply = len(board.move_stack)
+        cached = game.opening_match
+        if cached is not None and cached[0] == ply:
+            match = cached[1]
+        else:
+            match = _openings_db.identify_opening_keys(_get_move_keys(game))
+            game.opening_match = (ply, match)
         if match is not None:
             current_opening = {
                 "eco": match["eco"],
@@ -160,146 +431,452 @@ def _build_game_state(game_id: str, game: dict) -> dict:
                 "moves_matched": match["moves_matched"],
             }
 
-    state = GameState(
-        game_id=game_id,
-        fen=board.fen(),
-        board_display=str(board),
-        move_list=move_list,
-        last_move=last_move,
-        last_move_san=last_move_san,
-        eval_score=game.get("eval_score"),
-        player_color=game["player_color"],
-        target_elo=game["target_elo"],
-        is_game_over=board.is_game_over(),
-        result=result,
-        legal_moves=legal_moves,
-        accuracy=game.get("accuracy", {"white": 0.0, "black": 0.0}),
-        session_number=game.get("session_number", 1),
-        streak=game.get("streak", 0),
-        lesson_name=game.get("lesson_name", ""),
-        current_opening=current_opening,
-        material=_count_material(board),
-        captured_pieces=_get_captured_pieces(board),
-        is_check=board.is_check(),
-        is_checkmate=board.is_checkmate(),
-        is_stalemate=board.is_stalemate(),
-        move_annotations=_build_move_annotations(game),
-    )
-    return asdict(state)
+    # Built as a dict literal in GameState field order (see
+    # scripts.models.GameState): a GameState instance would only be
+    # converted straight back into this dict
+    state_dict = {
+        "game_id": game_id,
+        "fen": board.fen(),
+        # Only current_game.json carries the diagram; _sync_game_json
+        # renders it, so superseded and never-synced states skip it
+        "board_display": None,
+        # Copied: the record's san_list keeps growing after this snapshot
+        "move_list": list(move_list),
+        "move_list_pgn": pgn_str,
+        "last_move": last_move,
+        "last_move_san": last_move_san,
+        "eval_score": game.eval_score,
+        "player_color": game.player_color,
+        "target_elo": game.target_elo,
+        "is_game_over": outcome is not None,
+        "result": result,
+        # The SAN list is only written to current_game.json, so
+        # _schedule_sync fills it in; responses just need the count
+        "legal_moves": None,
+        "legal_moves_count": board.legal_moves.count(),
+        "accuracy": game.accuracy,
+        "session_number": game.session_number,
+        "streak": game.streak,
+        "lesson_name": game.lesson_name,
+        "current_opening": current_opening,
+        "material": _count_material(board),
+        "captured_pieces": _get_captured_pieces(board),
+        "is_check": board.is_check(),
+        "is_checkmate": termination == chess.Termination.CHECKMATE,
+        "is_stalemate": termination == chess.Termination.STALEMATE,
+        "move_annotations": _build_move_annotations(game),
+    }
+    game.state_cache = state_dict
+    return state_dict
+
+
+def _game_result(game: GameRecord) -> str | None:
+    """Return the game's result if it is over, without regenerating moves.
+
+    A fresh state_cache already holds the outcome _build_game_state worked
+    out for the current position; only a stale one costs an outcome() call.
+
+    Args:
+        game: Internal game record.
+
+    Returns:
+        Result string ("1-0", "0-1", "1/2-1/2"), or None if not over.
+    """
+    state = game.state_cache
+    if state is not None:
+        return state["result"]
+    outcome = game.board.outcome()
+    return outcome.result() if outcome is not None else None
 
 
-def _sync_game_json(game_state: dict) -> None:
+def _get_game_state(game_id: str, game: GameRecord) -> dict:
+    """Return the cached GameState dict, rebuilding it only when stale.
+
+    Args:
+        game_id: UUID of the game.
+        game: Internal game record.
+
+    Returns:
+        Dict representation of GameState.
+    """
+    state = game.state_cache
+    if state is None:
+        state = _build_game_state(game_id, game)
+    return state
+
+
+def _atomic_write_batch(
+    files: list[tuple[Path, str]], durable: bool = True,
+) -> None:
+    """Atomically write several text files with one commit phase.
+
+    Every file is first written (and, if durable, fsynced) to a sibling
+    .tmp file; only then are all of them renamed into place, and each
+    parent directory is fsynced once so the renames themselves are
+    durable. A failure while writing leaves every target untouched.
+
+    Args:
+        files: (target path, UTF-8 text) pairs.
+        durable: fsync the files and their directories. Without it,
+            readers still never see a partly written file, but a crash
+            may lose the write or leave an empty file behind.
+    """
+    pending = []
+    try:
+        for target, text in files:
+            tmp = target.with_name(target.name + ".tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            pending.append((tmp, target))
+            with os.fdopen(fd, "wb") as f:
+                f.write(text.encode("utf-8"))
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+    except BaseException:
+        for tmp, _ in pending:
+            tmp.unlink(missing_ok=True)
+        raise
+
+    for tmp, target in pending:
+        os.replace(tmp, target)
+
+    if durable and hasattr(os, "O_DIRECTORY"):
+        for parent in {target.parent for _, target in pending}:
+            dir_fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            except OSError as exc:
+                # Some network filesystems (SMB, some FUSE mounts) refuse
+                # to fsync a directory; the files themselves are synced
+                if exc.errno not in (errno.ENOTSUP, errno.EINVAL):
+                    raise
+            finally:
+                os.close(dir_fd)
+
+
+def _sync_game_json(
+    game_state: dict,
+    force: bool = False,
+    extra_files: list[tuple[Path, str]] | None = None,
+    durable: bool = False,
+) -> None:
     """Write game state to data/current_game.json atomically.
 
-    Uses temp file + os.replace() for atomic write.
+    The file is a derived view for the TUI and dashboard, rebuilt on the
+    next move, so by default it is only renamed into place, not fsynced:
+    readers never see a torn file, and a crash costs at most the latest
+    state. The write is skipped when the serialized state matches the
+    last one written and the file on disk is still the one that write
+    produced.
 
     Args:
-        game_state: GameState dict to persist.
+        game_state: GameState dict to persist. Not mutated: a None
+            board_display is rendered into the written copy only.
+        force: Write even if the state is unchanged.
+        extra_files: Other (path, text) pairs to write in the same
+            _atomic_write_batch; the state is then always written, and
+            the whole batch durably.
+        durable: fsync the state (and its directory) before returning.
     """
-    _DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if game_state.get("board_display", "") is None:
+        # The dict may be a game's cached state, shared with tool threads
+        game_state = {**game_state, "board_display": _board_display(game_state["fen"])}
+    # Compact, since only the TUI and dashboard read this file
+    text = _GAME_STATE_ENCODER.encode(game_state)
+    digest = hash(text)
     target = _DATA_DIR / "current_game.json"
-    tmp = _DATA_DIR / "current_game.tmp"
-    tmp.write_text(
-        json.dumps(game_state, indent=2, default=str, ensure_ascii=False),
-        encoding="utf-8",
+
+    if not force and not extra_files and digest == _last_sync["digest"]:
+        try:
+            st = target.stat()
+        except OSError:
+            st = None
+        if st is not None and (st.st_mtime_ns, st.st_size) == _last_sync["stat"]:
+            return
+
+    _DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if extra_files:
+        _atomic_write_batch([(target, text), *extra_files])
+    else:
+        _atomic_write_batch([(target, text)], durable=durable)
+    st = target.stat()
+    _last_sync.update(
+        digest=digest, stat=(st.st_mtime_ns, st.st_size), time=time.monotonic(),
     )
-    os.replace(tmp, target)
 
 
-def _auto_save_pgn(game_id: str, game: dict) -> None:
-    """Auto-save PGN file when a game ends.
+def _schedule_sync(
+    game_state: dict,
+    force: bool = False,
+    extra_files: list[tuple[Path, str]] | None = None,
+    durable: bool = False,
+    board: chess.Board | None = None,
+) -> None:
+    """Sync game state to current_game.json, coalescing bursts of updates.
 
-    Builds PGN from the board's move stack and writes it atomically
-    to data/games/. Includes player and engine Elo in headers.
+    A state arriving at least _SYNC_DEBOUNCE_S after the last write is
+    written at once. One arriving sooner is parked, and a timer writes the
+    latest parked state when the window closes, so a burst of moves costs
+    two writes rather than one per move.
+
+    Args:
+        game_state: GameState dict to persist. Parked as-is, so it must not
+            be mutated afterwards (_build_game_state returns a fresh dict).
+        force: Write immediately, superseding any parked state.
+        extra_files: Other (path, text) pairs, such as a finished game's
+            PGN, to write now in one batch with the state (implies an
+            immediate write).
+        durable: Write now and fsync, for states that start a game.
+        board: The game's live board, read while the caller holds the
+            game's lock, to list legal moves for a state built without
+            them (see _build_game_state).
+    """
+    if board is not None and game_state.get("legal_moves", ()) is None:
+        # Listed now, into a copy: the write may happen on the timer
+        # thread, after the caller has released the game's lock
+        game_state = {**game_state, "legal_moves": _legal_sans(board)}
+    with _sync_lock:
+        idle = time.monotonic() - _last_sync["time"] >= _SYNC_DEBOUNCE_S
+        now = force or extra_files or durable
+        if now or (idle and _pending_sync["timer"] is None):
+            _cancel_pending_sync()
+            _sync_game_json(
+                game_state, force=force, extra_files=extra_files, durable=durable,
+            )
+            return
+
+        _pending_sync["state"] = game_state
+        if _pending_sync["timer"] is None:
+            timer = threading.Timer(_SYNC_DEBOUNCE_S, _flush_game_json)
+            timer.daemon = True
+            _pending_sync["timer"] = timer
+            timer.start()
+
+
+def _cancel_pending_sync() -> dict | None:
+    """Drop the parked state and its timer.
+
+    Returns:
+        The parked GameState dict, or None if nothing was pending.
+    """
+    with _sync_lock:
+        timer = _pending_sync["timer"]
+        if timer is not None:
+            timer.cancel()
+        state = _pending_sync["state"]
+        _pending_sync.update(state=None, timer=None)
+        return state
+
+
+def _flush_game_json() -> None:
+    """Write the parked game state now, if there is one."""
+    with _sync_lock:
+        state = _cancel_pending_sync()
+        if state is not None:
+            _sync_game_json(state)
+
+
+def _export_pgn(game: GameRecord, headers: dict[str, str]) -> str:
+    """Export the game as PGN text without building a game tree.
+
+    Gives the same text as str(chess.pgn.Game.from_board(board)) with
+    headers set, but the movetext comes from the record's SAN list, so no
+    GameNode is allocated per move and no SAN is formatted again.
 
     Args:
-        game_id: UUID of the game.
         game: Internal game record.
+        headers: Header tags to set on top of the defaults.
+
+    Returns:
+        PGN text: header tags, a blank line, then the movetext on one line.
     """
-    board: chess.Board = game["board"]
+    sans = game.san_list
+    if sans is None:
+        sans = game.san_list = _replay_san_list(game)
+
+    # A moveless Game supplies the Seven Tag Roster defaults; the FEN/SetUp
+    # tags setup() would add come straight from the stored starting FEN,
+    # so no starting board is rebuilt
+    start = game.starting_fen
     pgn_game = chess.pgn.Game()
+    if start != chess.STARTING_FEN:
+        pgn_game.headers["FEN"] = start
+        pgn_game.headers["SetUp"] = "1"
+    for name, value in headers.items():
+        pgn_game.headers[name] = value
+    result = _game_result(game) or "*"
+    pgn_game.headers["Result"] = result
+
+    # Movetext as python-chess's StringExporter writes it: a number before
+    # every White move, and "N..." before a first move made by Black
+    _, side, _, _, _, fullmove_field = start.split(" ")
+    tokens = []
+    turn = side == "w"
+    fullmove = int(fullmove_field)
+    for san in sans:
+        if turn == chess.WHITE:
+            tokens.append(f"{fullmove}.")
+        else:
+            if not tokens:
+                tokens.append(f"{fullmove}...")
+            fullmove += 1
+        tokens.append(san)
+        turn = not turn
+    tokens.append(result)
+
+    lines = [f'[{name} "{value}"]' for name, value in pgn_game.headers.items()]
+    lines.append("")
+    lines.append(" ".join(tokens))
+    return "\n".join(lines)
+
 
-    # Set up the game from starting FEN if not standard
-    starting_fen = game["starting_fen"]
-    if starting_fen != chess.STARTING_FEN:
-        pgn_game.setup(chess.Board(starting_fen))
+def _game_pgn_file(game_id: str, game: GameRecord) -> tuple[Path, str]:
+    """Build the PGN file auto-saved to data/games/ when a game ends.
+
+    Builds PGN from the board's move stack, with player and engine Elo
+    in the headers. The caller writes it, in the same batch as the final
+    current_game.json (see _schedule_sync).
+
+    Args:
+        game_id: UUID of the game.
+        game: Internal game record.
 
+    Returns:
+        (target path, PGN text) pair for _atomic_write_batch.
+    """
     # Read player Elo from progress.json
-    player_elo = "unknown"
-    progress_path = _DATA_DIR / "progress.json"
-    try:
-        if progress_path.exists():
-            progress = json.loads(progress_path.read_text(encoding="utf-8"))
-            player_elo = str(progress.get("current_elo", progress.get("estimated_elo", "unknown")))
-    except (json.JSONDecodeError, OSError):
-        pass
+    progress = load_progress(_DATA_DIR / "progress.json")
+    player_elo = str(progress.get("current_elo", progress.get("estimated_elo", "unknown")))
 
-    target_elo = game["target_elo"]
-    player_color = game["player_color"]
+    target_elo = game.target_elo
+    player_color = game.player_color
 
     # PGN headers
     now = datetime.now(timezone.utc)
-    pgn_game.headers["Event"] = "Chess Speedrun"
-    pgn_game.headers["Site"] = "Chess Rocket"
-    pgn_game.headers["Date"] = now.strftime("%Y.%m.%d")
-    pgn_game.headers["White"] = (
-        f"Player (Elo {player_elo})" if player_color == "white"
-        else f"Stockfish (Elo {target_elo})"
-    )
-    pgn_game.headers["Black"] = (
-        f"Player (Elo {player_elo})" if player_color == "black"
-        else f"Stockfish (Elo {target_elo})"
-    )
-    if board.is_game_over():
-        pgn_game.headers["Result"] = board.result()
-
-    # Replay moves into PGN
-    node = pgn_game
-    for m in board.move_stack:
-        node = node.add_variation(m)
-
-    # Write atomically to data/games/
+    pgn_text = _export_pgn(game, {
+        "Event": "Chess Speedrun",
+        "Site": "Chess Rocket",
+        "Date": now.strftime("%Y.%m.%d"),
+        "White": (
+            f"Player (Elo {player_elo})" if player_color == "white"
+            else f"Stockfish (Elo {target_elo})"
+        ),
+        "Black": (
+            f"Player (Elo {player_elo})" if player_color == "black"
+            else f"Stockfish (Elo {target_elo})"
+        ),
+    })
     games_dir = _DATA_DIR / "games"
     games_dir.mkdir(parents=True, exist_ok=True)
     timestamp = now.strftime("%Y%m%d_%H%M%S")
     filename = f"game_{timestamp}_{game_id[:8]}.pgn"
-    target = games_dir / filename
-    tmp = games_dir / f"{filename}.tmp"
-    tmp.write_text(str(pgn_game) + "\n", encoding="utf-8")
-    os.replace(tmp, target)
+    return games_dir / filename, pgn_text + "\n"
 
 
-def _get_game(game_id: str) -> dict | None:
+def _get_game(game_id: str) -> GameRecord | None:
     """Look up a game by ID.
 
     Args:
         game_id: UUID string.
 
     Returns:
-        Game record dict or None if not found.
+        GameRecord or None if not found.
     """
     return _games.get(game_id)
 
 
-def _recompute_accuracy(game: dict) -> None:
-    """Recompute accuracy percentages from stored move evaluations.
+def _get_engine(game: GameRecord) -> ChessEngine:
+    """Return the game's engine, starting it at the game's Elo on first use.
+
+    Game records may be created with engine=None (e.g. opening quizzes) so
+    that no Stockfish process is spawned unless the game actually needs one.
 
-    Updates game['accuracy'] dict with per-color accuracy based on
-    the proportion of moves with cp_loss <= 30 (great or best).
+    Args:
+        game: Internal game record.
+
+    Returns:
+        The game's ChessEngine.
+    """
+    engine = game.engine
+    if engine is None:
+        engine = ChessEngine()
+        engine.set_difficulty(game.target_elo)
+        game.engine = engine
+    return engine
+
+
+def _get_analysis_engine() -> ChessEngine:
+    """Return the shared full-strength analysis engine, starting it on first use.
+
+    analyze_position and the post-game tools reuse one Stockfish process
+    instead of paying process startup and network load on every call.
+    ChessEngine restarts the process itself if it dies. Closed when the
+    server exits (an atexit hook would run too late: SimpleEngine's
+    non-daemon thread keeps the interpreter from reaching it).
+
+    Callers hold _analysis_lock around each search: SimpleEngine cancels
+    a running command when another thread sends a new one.
+
+    Returns:
+        ChessEngine configured at Elo 3000.
+    """
+    global _analysis_engine
+    with _analysis_lock:
+        if _analysis_engine is not None:
+            return _analysis_engine
+        # A larger hash lets consecutive searches over one game's plies
+        # reuse each other's transposition-table entries (python-chess only
+        # sends ucinewgame on the first search, so the table persists);
+        # half the cores leaves room for the per-game play engines
+        engine = ChessEngine(hash_mb=_ANALYSIS_HASH_MB, threads=_ANALYSIS_THREADS)
+        engine.set_difficulty(3000)
+        _analysis_engine = engine
+        return engine
+
+
+def _get_helper_engines(count: int) -> list[ChessEngine]:
+    """Return count full-strength helper engines, starting any still missing.
+
+    Helpers back _evaluate_moves_parallel alongside the shared analysis
+    engine and stay running between calls, so only the first parallel
+    evaluation pays for process startup.
 
     Args:
-        game: Internal game record with 'move_evals' list.
+        count: Number of helper engines needed.
+
+    Returns:
+        The first count helper engines.
     """
-    move_evals = game.get("move_evals", [])
-    counts = {"white": 0, "black": 0}
-    good = {"white": 0, "black": 0}
+    while len(_helper_engines) < count:
+        engine = ChessEngine()
+        engine.set_difficulty(3000)
+        _helper_engines.append(engine)
+    return _helper_engines[:count]
 
-    for ev in move_evals:
-        color = ev.get("color", "white")
-        counts[color] += 1
-        if ev.get("cp_loss", 999) <= 30:
-            good[color] += 1
 
+def _close_analysis_engine() -> None:
+    """Shut down the shared analysis engine and helpers, if they were started."""
+    global _analysis_engine
+    with _analysis_lock:
+        if _analysis_engine is not None:
+            _analysis_engine.close()
+            _analysis_engine = None
+        for engine in _helper_engines:
+            engine.close()
+        _helper_engines.clear()
+
+
+def _update_accuracy(game: GameRecord) -> None:
+    """Set game.accuracy from the record's running eval tallies.
+
+    Accuracy is the proportion of moves with cp_loss <= 30 (great or
+    best) per color.
+
+    Args:
+        game: Internal game record.
+    """
+    counts = game.eval_counts
+    good = game.eval_good
     accuracy = {}
     for color in ("white", "black"):
         if counts[color] > 0:
@@ -307,7 +884,92 @@ def _recompute_accuracy(game: dict) -> None:
         else:
             accuracy[color] = 0.0
 
-    game["accuracy"] = accuracy
+    game.accuracy = accuracy
+
+
+def _tally_eval(game: GameRecord, ev: dict, delta: int) -> None:
+    """Add (delta=1) or remove (delta=-1) one eval from the running tallies.
+
+    Args:
+        game: Internal game record.
+        ev: Stored move evaluation record.
+        delta: +1 when the eval is added, -1 when it is dropped.
+    """
+    color = ev.get("color", "white")
+    game.eval_counts[color] += delta
+    if ev.get("cp_loss", 999) <= _GOOD_MOVE_MAX_CP_LOSS:
+        game.eval_good[color] += delta
+
+
+def _recompute_accuracy(game: GameRecord) -> None:
+    """Rebuild the eval tallies and accuracy from all stored move evals.
+
+    Fallback for records whose move_evals were replaced wholesale; the
+    tools themselves keep the tallies in step incrementally.
+
+    Args:
+        game: Internal game record with its move_evals list.
+    """
+    # One pass with local counters rather than per-eval _tally_eval calls
+    counts = {"white": 0, "black": 0}
+    good = {"white": 0, "black": 0}
+    for ev in game.move_evals:
+        color = ev.get("color", "white")
+        counts[color] += 1
+        good[color] += ev.get("cp_loss", 999) <= _GOOD_MOVE_MAX_CP_LOSS
+    game.eval_counts = counts
+    game.eval_good = good
+    _update_accuracy(game)
+
+
+def _with_game_lock(fn):
+    """Run a game_id tool while holding that game's lock.
+
+    Tools registered with _threaded_tool run on worker threads, so a
+    search on one game can overlap any other tool call. The lock keeps
+    each game's board, caches and engine to one tool at a time; calls
+    for other games are not held up. Only use it under _threaded_tool:
+    waiting for the lock on the event loop would stall every request
+    for as long as a search holds it.
+
+    Args:
+        fn: Tool function whose first parameter is game_id.
+
+    Returns:
+        The wrapped function, with fn's signature and docstring.
+    """
+    @functools.wraps(fn)
+    def locked(game_id: str, *args, **kwargs):
+        game = _games.get(game_id)
+        if game is None:
+            return fn(game_id, *args, **kwargs)
+        with game.lock:
+            return fn(game_id, *args, **kwargs)
+
+    return locked
+
+
+def _threaded_tool(fn):
+    """Register fn as an MCP tool that runs on a worker thread.
+
+    FastMCP calls synchronous tools directly on its event loop, so a
+    Stockfish search, or a tool waiting on the game lock a search holds,
+    would stall every other request. The registered tool is an async
+    wrapper that awaits asyncio.to_thread(fn); the module-level name
+    stays bound to the plain function for direct callers.
+
+    Args:
+        fn: Synchronous tool function.
+
+    Returns:
+        fn itself.
+    """
+    @functools.wraps(fn)
+    async def run_in_thread(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    mcp.tool()(run_in_thread)
+    return fn
 
 
 # ---------------------------------------------------------------------------
@@ -331,40 +993,39 @@ def new_game(
     Returns:
         GameState dict with initial board position.
     """
+    board = _board_from_fen(starting_fen or chess.STARTING_FEN)
+    if isinstance(board, dict):
+        return board
+
+    # Started only once the FEN is known to be good, so a rejected
+    # position never leaves a Stockfish process behind
     game_id = str(uuid.uuid4())
     engine = ChessEngine()
-
-    fen = starting_fen or chess.STARTING_FEN
-    try:
-        board = chess.Board(fen)
-        if not board.is_valid():
-            return {"error": f"Invalid FEN position: {fen}"}
-    except ValueError as exc:
-        return {"error": f"Invalid FEN: {exc}"}
-
     engine.set_difficulty(target_elo)
 
-    game = {
-        "engine": engine,
-        "board": board,
-        "player_color": player_color,
-        "target_elo": target_elo,
-        "starting_fen": fen,
-        "eval_score": None,
-        "accuracy": {"white": 0.0, "black": 0.0},
-        "session_number": 1,
-        "streak": 0,
-        "lesson_name": "",
-        "move_evals": [],
-    }
+    game = GameRecord(
+        board=board,
+        player_color=player_color,
+        target_elo=target_elo,
+        # Normalized, so it can be compared with STARTING_FEN and used
+        # as the PGN FEN tag as-is
+        starting_fen=board.fen(),
+        engine=engine,
+        san_list=[],
+        pgn_str="",
+        move_keys=[],
+    )
     _games[game_id] = game
 
     state = _build_game_state(game_id, game)
-    _sync_game_json(state)
+    # A new game replaces the previous one on the dashboard; make sure
+    # the switch survives a crash rather than showing the old board
+    _schedule_sync(state, durable=True, board=board)
     return minify_game_state(state)
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def get_board(game_id: str) -> dict:
     """Get the current board state for a game.
 
@@ -378,10 +1039,11 @@ def get_board(game_id: str) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    return minify_game_state(_build_game_state(game_id, game))
+    return minify_game_state(_get_game_state(game_id, game))
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def make_move(game_id: str, move: str) -> dict:
     """Make a player move in SAN notation.
 
@@ -396,32 +1058,38 @@ def make_move(game_id: str, move: str) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
-    if board.is_game_over():
-        return {"error": f"Game is already over. Result: {board.result()}"}
+    result = _game_result(game)
+    if result is not None:
+        return {"error": f"Game is already over. Result: {result}"}
 
     try:
         chess_move = board.parse_san(move)
     except (chess.InvalidMoveError, chess.IllegalMoveError, chess.AmbiguousMoveError):
-        legal = [board.san(m) for m in board.legal_moves]
+        legal = _legal_sans(board)
         return {"error": f"Illegal move: {move}. Legal moves: {legal}"}
 
-    if chess_move not in board.legal_moves:
-        legal = [board.san(m) for m in board.legal_moves]
+    # parse_san already rejects illegal moves; the one thing it lets
+    # through is a null move ("--", "0000"), which is falsy
+    if not chess_move:
+        legal = _legal_sans(board)
         return {"error": f"Illegal move: {move}. Legal moves: {legal}"}
 
-    board.push(chess_move)
-
-    if board.is_game_over():
-        _auto_save_pgn(game_id, game)
+    _push_move(game, chess_move)
 
     state = _build_game_state(game_id, game)
-    _sync_game_json(state)
+    if state["is_game_over"]:
+        _schedule_sync(
+            state, extra_files=[_game_pgn_file(game_id, game)], board=game.board,
+        )
+    else:
+        _schedule_sync(state, board=game.board)
     return minify_game_state(state)
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def engine_move(game_id: str) -> dict:
     """Have the engine make its move.
 
@@ -435,20 +1103,34 @@ def engine_move(game_id: str) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
-
-    if board.is_game_over():
-        return {"error": f"Game is already over. Result: {board.result()}"}
-
-    engine: ChessEngine = game["engine"]
-    chess_move = engine.get_engine_move(board)
-    board.push(chess_move)
-
-    if board.is_game_over():
-        _auto_save_pgn(game_id, game)
+    board: chess.Board = game.board
+
+    result = _game_result(game)
+    if result is not None:
+        return {"error": f"Game is already over. Result: {result}"}
+
+    # In book, at a strength that would play a main line anyway, reply
+    # with one (within a quarter of the most popular continuation's line
+    # count, weighted by line count) instead of searching
+    book = _book_moves(game) if game.target_elo >= _BOOK_MIN_ELO else []
+    if book:
+        top_lines = book[0][1]
+        main_lines = [(m, lines) for m, lines in book if lines * 4 >= top_lines]
+        chess_move = random.choices(
+            [m for m, _ in main_lines], weights=[lines for _, lines in main_lines],
+        )[0]
+    else:
+        engine = _get_engine(game)
+        chess_move = engine.get_engine_move(board)
+    _push_move(game, chess_move)
 
     state = _build_game_state(game_id, game)
-    _sync_game_json(state)
+    if state["is_game_over"]:
+        _schedule_sync(
+            state, extra_files=[_game_pgn_file(game_id, game)], board=game.board,
+        )
+    else:
+        _schedule_sync(state, board=game.board)
     return minify_game_state(state)
 
 
@@ -457,7 +1139,7 @@ def engine_move(game_id: str) -> dict:
 # ---------------------------------------------------------------------------
 
 
-@mcp.tool()
+@_threaded_tool
 def analyze_position(
     fen: str,
     depth: int = 20,
@@ -475,30 +1157,26 @@ def analyze_position(
     Returns:
         Dict with fen, depth, and lines (each with rank, score_cp, moves, mate_in).
     """
-    try:
-        board = chess.Board(fen)
-        if not board.is_valid():
-            return {"error": f"Invalid FEN position: {fen}"}
-    except ValueError as exc:
-        return {"error": f"Invalid FEN: {exc}"}
+    board = _board_from_fen(fen)
+    if isinstance(board, dict):
+        return board
 
-    engine = ChessEngine()
-    try:
+    engine = _get_analysis_engine()
+    with _analysis_lock:
         raw_lines = engine.analyze_position(board, depth=depth, multipv=multipv)
-        lines = []
-        for i, line in enumerate(raw_lines, 1):
-            lines.append({
-                "rank": i,
-                "score_cp": line["score_cp"],
-                "moves": line["pv"],
-                "mate_in": line["mate"],
-            })
-        return minify_analysis({"fen": fen, "depth": depth, "lines": lines})
-    finally:
-        engine.close()
+    lines = []
+    for i, line in enumerate(raw_lines, 1):
+        lines.append({
+            "rank": i,
+            "score_cp": line["score_cp"],
+            "moves": line["pv"],
+            "mate_in": line["mate"],
+        })
+    return minify_analysis({"fen": fen, "depth": depth, "lines": lines})
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def evaluate_move(game_id: str, move: str) -> dict:
     """Evaluate a move's quality without making it.
 
@@ -513,42 +1191,59 @@ def evaluate_move(game_id: str, move: str) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
-    if board.is_game_over():
-        return {"error": f"Game is already over. Result: {board.result()}"}
+    result = _game_result(game)
+    if result is not None:
+        return {"error": f"Game is already over. Result: {result}"}
 
     try:
         chess_move = board.parse_san(move)
     except (chess.InvalidMoveError, chess.IllegalMoveError, chess.AmbiguousMoveError):
-        legal = [board.san(m) for m in board.legal_moves]
+        legal = _legal_sans(board)
+        return {"error": f"Illegal move: {move}. Legal moves: {legal}"}
+    if not chess_move:
+        legal = _legal_sans(board)
         return {"error": f"Illegal move: {move}. Legal moves: {legal}"}
 
-    engine: ChessEngine = game["engine"]
+    engine = _get_engine(game)
     evaluation = engine.evaluate_move(board, chess_move)
+    # Book moves keep their real evaluation; the flag only marks them
+    evaluation.is_book = any(m == chess_move for m, _ in _book_moves(game))
 
     # Store evaluation for accuracy tracking
     color = "white" if board.turn == chess.WHITE else "black"
     ply = len(board.move_stack)
+    # Kept in the move_annotations shape the TUI reads; the best move is
+    # in the tool's response but never needed again
     eval_record = {
-        "move_san": evaluation.move_san,
-        "best_move_san": evaluation.best_move_san,
-        "cp_loss": evaluation.cp_loss,
+        "move": evaluation.move_san,
         "classification": evaluation.classification,
-        "color": color,
+        "cp_loss": evaluation.cp_loss,
         "ply": ply,
+        "color": color,
     }
-    game.setdefault("move_evals", []).append(eval_record)
-
-    # Recompute accuracy and sync to TUI
-    _recompute_accuracy(game)
-    state = _build_game_state(game_id, game)
-    _sync_game_json(state)
+    game.move_evals.append(eval_record)
+    _tally_eval(game, eval_record, 1)
+
+    # Refresh accuracy and sync to TUI. The board is unchanged, so only
+    # the evaluation-derived fields of the cached state need refreshing.
+    _update_accuracy(game)
+    # A new dict rather than an update in place: the cached state may
+    # already be parked for the sync timer, which encodes it unlocked
+    state = {
+        **_get_game_state(game_id, game),
+        "accuracy": dict(game.accuracy),
+        "move_annotations": _build_move_annotations(game),
+    }
+    game.state_cache = state
+    _schedule_sync(state, board=game.board)
 
-    return minify_move_evaluation(asdict(evaluation))
+    return minify_move_evaluation(evaluation.to_dict())
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def set_difficulty(game_id: str, target_elo: int) -> dict:
     """Change engine difficulty mid-game.
 
@@ -564,9 +1259,12 @@ def set_difficulty(game_id: str, target_elo: int) -> dict:
         return {"error": f"Game not found: {game_id}"}
 
     clamped_elo = max(100, min(3500, target_elo))
-    engine: ChessEngine = game["engine"]
-    engine.set_difficulty(clamped_elo)
-    game["target_elo"] = clamped_elo
+    engine = game.engine
+    if engine is not None:
+        engine.set_difficulty(clamped_elo)
+    # An engine started later picks up target_elo in _get_engine
+    game.target_elo = clamped_elo
+    game.state_cache = None
 
     return {
         "game_id": game_id,
@@ -580,7 +1278,8 @@ def set_difficulty(game_id: str, target_elo: int) -> dict:
 # ---------------------------------------------------------------------------
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def get_game_pgn(game_id: str) -> dict:
     """Export game as PGN string.
 
@@ -594,32 +1293,22 @@ def get_game_pgn(game_id: str) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
-    pgn_game = chess.pgn.Game()
-
-    # Set headers
-    pgn_game.headers["Event"] = "Chess Speedrun"
-    pgn_game.headers["White"] = (
-        "Player" if game["player_color"] == "white" else f"Stockfish (Elo {game['target_elo']})"
-    )
-    pgn_game.headers["Black"] = (
-        "Player" if game["player_color"] == "black" else f"Stockfish (Elo {game['target_elo']})"
-    )
-
-    if board.is_game_over():
-        pgn_game.headers["Result"] = board.result()
-
-    # Replay moves into PGN
-    node = pgn_game
-    temp = chess.Board(game["starting_fen"])
-    for m in board.move_stack:
-        node = node.add_variation(m)
-        temp.push(m)
-
-    return {"pgn": str(pgn_game)}
+    pgn = _export_pgn(game, {
+        "Event": "Chess Speedrun",
+        "White": (
+            "Player" if game.player_color == "white"
+            else f"Stockfish (Elo {game.target_elo})"
+        ),
+        "Black": (
+            "Player" if game.player_color == "black"
+            else f"Stockfish (Elo {game.target_elo})"
+        ),
+    })
+    return {"pgn": pgn}
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def get_legal_moves(game_id: str, square: str | None = None) -> dict:
     """List legal moves, optionally filtered by source square.
 
@@ -634,7 +1323,7 @@ def get_legal_moves(game_id: str, square: str | None = None) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
     if square is not None:
         try:
@@ -642,16 +1331,25 @@ def get_legal_moves(game_id: str, square: str | None = None) -> dict:
         except ValueError:
             return {"error": f"Invalid square: {square}"}
 
-        moves = [
-            board.san(m) for m in board.legal_moves if m.from_square == sq
-        ]
+        if not board.occupied_co[board.turn] & chess.BB_SQUARES[sq]:
+            # Empty or opponent's square: nothing can move from it
+            moves = []
+        else:
+            # The memoized SAN list follows legal-move generation order, so
+            # zip it with the moves rather than formatting SAN again
+            moves = [
+                san
+                for m, san in zip(board.legal_moves, _legal_sans(board))
+                if m.from_square == sq
+            ]
     else:
-        moves = [board.san(m) for m in board.legal_moves]
+        moves = list(_legal_sans(board))
 
     return {"game_id": game_id, "square": square, "legal_moves": moves}
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def undo_move(game_id: str) -> dict:
     """Undo the last move. If last two were player+engine, undoes both.
 
@@ -665,30 +1363,30 @@ def undo_move(game_id: str) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
     if not board.move_stack:
         return {"error": "No moves to undo"}
 
     # Undo last move
-    board.pop()
+    _pop_move(game)
 
     # If there's still a move and it's now the opponent's turn
     # (meaning we undid one of a pair), undo the second too
     # so the player is back on their turn
-    player_is_white = game["player_color"] == "white"
-    player_turn = chess.WHITE if player_is_white else chess.BLACK
-    if board.move_stack and board.turn != player_turn:
-        board.pop()
+    if board.move_stack and board.turn != game.player_turn:
+        _pop_move(game)
 
-    # Filter out move evals that are no longer valid after undo
+    # Drop move evals that are no longer valid after undo. Evals are
+    # appended in ply order, so the stale ones are all at the end.
     current_ply = len(board.move_stack)
-    move_evals = game.get("move_evals", [])
-    game["move_evals"] = [ev for ev in move_evals if ev.get("ply", 0) < current_ply]
-    _recompute_accuracy(game)
+    move_evals = game.move_evals
+    while move_evals and move_evals[-1].get("ply", 0) >= current_ply:
+        _tally_eval(game, move_evals.pop(), -1)
+    _update_accuracy(game)
 
     state = _build_game_state(game_id, game)
-    _sync_game_json(state)
+    _schedule_sync(state, board=game.board)
     return minify_game_state(state)
 
 
@@ -704,12 +1402,9 @@ def set_position(fen: str) -> dict:
     Returns:
         GameState dict for the new game.
     """
-    try:
-        board = chess.Board(fen)
-        if not board.is_valid():
-            return {"error": f"Invalid FEN position: {fen}"}
-    except ValueError as exc:
-        return {"error": f"Invalid FEN: {exc}"}
+    board = _board_from_fen(fen)
+    if isinstance(board, dict):
+        return board
 
     game_id = str(uuid.uuid4())
     engine = ChessEngine()
@@ -718,27 +1413,58 @@ def set_position(fen: str) -> dict:
 
     player_color = "white" if board.turn == chess.WHITE else "black"
 
-    game = {
-        "engine": engine,
-        "board": board,
-        "player_color": player_color,
-        "target_elo": 3000,
-        "starting_fen": fen,
-        "eval_score": None,
-        "accuracy": {"white": 0.0, "black": 0.0},
-        "session_number": 1,
-        "streak": 0,
-        "lesson_name": "",
-        "move_evals": [],
-    }
+    game = GameRecord(
+        board=board,
+        player_color=player_color,
+        target_elo=3000,
+        # Normalized, so it can be compared with STARTING_FEN and used
+        # as the PGN FEN tag as-is
+        starting_fen=board.fen(),
+        engine=engine,
+        san_list=[],
+        pgn_str="",
+        move_keys=[],
+    )
     _games[game_id] = game
 
     state = _build_game_state(game_id, game)
-    _sync_game_json(state)
+    _schedule_sync(state, board=game.board)
     return minify_game_state(state)
 
 
-@mcp.tool()
+def _get_srs() -> SRSManager:
+    """Return the shared SRSManager, reloading it if its file changed.
+
+    The card file is parsed once and reused across tool calls. A change
+    to its (mtime, size) that _srs_saved() did not record, such as a
+    review through the srs.py CLI, makes the next call reload it.
+    Callers hold _srs_lock from here until their _srs_saved() call.
+
+    Returns:
+        The shared SRSManager.
+    """
+    manager = _srs_cache["manager"]
+    if manager is None:
+        manager = SRSManager()
+    elif _file_key(manager.cards_path) == _srs_cache["key"]:
+        return manager
+    else:
+        manager = SRSManager(str(manager.cards_path))
+    _srs_cache.update(manager=manager, key=_file_key(manager.cards_path))
+    return manager
+
+
+def _srs_saved(manager: SRSManager) -> None:
+    """Record the card file written by manager as already loaded.
+
+    Args:
+        manager: The shared SRSManager, after a call that saved it.
+    """
+    _srs_cache["key"] = _file_key(manager.cards_path)
+
+
+@_threaded_tool
+@_with_game_lock
 def srs_add_card(
     game_id: str,
     move: str,
@@ -760,7 +1486,7 @@ def srs_add_card(
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
     # Evaluate the move to get classification info
     try:
@@ -768,19 +1494,21 @@ def srs_add_card(
     except (chess.InvalidMoveError, chess.IllegalMoveError, chess.AmbiguousMoveError):
         return {"error": f"Invalid move: {move}"}
 
-    engine: ChessEngine = game["engine"]
+    engine = _get_engine(game)
     evaluation = engine.evaluate_move(board, chess_move)
 
-    srs = SRSManager()
-    card = srs.add_card(
-        fen=board.fen(),
-        player_move=evaluation.move_san,
-        best_move=evaluation.best_move_san,
-        cp_loss=evaluation.cp_loss,
-        classification=evaluation.classification,
-        motif=evaluation.tactical_motif,
-        explanation=explanation,
-    )
+    with _srs_lock:
+        srs = _get_srs()
+        card = srs.add_card(
+            fen=board.fen(),
+            player_move=evaluation.move_san,
+            best_move=evaluation.best_move_san,
+            cp_loss=evaluation.cp_loss,
+            classification=evaluation.classification,
+            motif=evaluation.tactical_motif,
+            explanation=explanation,
+        )
+        _srs_saved(srs)
     return card
 
 
@@ -789,7 +1517,8 @@ def srs_add_card(
 # ---------------------------------------------------------------------------
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def save_session(
     game_id: str,
     estimated_elo: int | None = None,
@@ -815,7 +1544,7 @@ def save_session(
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
     # Load existing progress or defaults
     progress_path = _DATA_DIR / "progress.json"
@@ -829,24 +1558,19 @@ def save_session(
         "areas_for_improvement": [],
         "last_session": None,
     }
-    try:
-        if progress_path.exists():
-            progress = json.loads(progress_path.read_text(encoding="utf-8"))
-            for k, v in defaults.items():
-                progress.setdefault(k, v)
-        else:
-            progress = dict(defaults)
-    except (json.JSONDecodeError, OSError):
-        progress = dict(defaults)
+    # Copied from the shared cache; accuracy_history is appended to below
+    progress = dict(load_progress(progress_path))
+    for k, v in defaults.items():
+        progress.setdefault(k, v)
+    progress["accuracy_history"] = list(progress["accuracy_history"])
 
     # Auto-compute accuracy_pct from stored move evals if not provided
     if accuracy_pct is None:
-        move_evals = game.get("move_evals", [])
-        player_color = game["player_color"]
-        player_evals = [ev for ev in move_evals if ev.get("color") == player_color]
-        if player_evals:
-            good_moves = sum(1 for ev in player_evals if ev.get("cp_loss", 999) <= 30)
-            accuracy_pct = round(good_moves / len(player_evals) * 100, 1)
+        player_color = game.player_color
+        evaluated = game.eval_counts[player_color]
+        if evaluated:
+            good_moves = game.eval_good[player_color]
+            accuracy_pct = round(good_moves / evaluated * 100, 1)
 
     # Update progress
     if estimated_elo is not None:
@@ -862,22 +1586,12 @@ def save_session(
     if areas_for_improvement is not None:
         progress["areas_for_improvement"] = areas_for_improvement
 
-    # Write progress atomically
-    _DATA_DIR.mkdir(parents=True, exist_ok=True)
-    tmp_progress = _DATA_DIR / "progress.json.tmp"
-    tmp_progress.write_text(
-        json.dumps(progress, indent=2, ensure_ascii=False),
-        encoding="utf-8",
-    )
-    os.replace(tmp_progress, progress_path)
-
     # Build session log
     session_num = progress["sessions_completed"]
     session_id = f"session_{session_num:03d}"
 
-    result = None
-    if board.is_game_over():
-        result = board.result()
+    outcome = board.outcome()
+    result = outcome.result() if outcome is not None else None
     total_moves = len(board.move_stack)
 
     session_log = {
@@ -885,8 +1599,8 @@ def save_session(
         "game_id": game_id,
         "date": now_iso,
         "result": result,
-        "player_color": game["player_color"],
-        "target_elo": game["target_elo"],
+        "player_color": game.player_color,
+        "target_elo": game.target_elo,
         "estimated_elo": progress["estimated_elo"],
         "total_moves": total_moves,
         "accuracy_pct": accuracy_pct,
@@ -895,16 +1609,22 @@ def save_session(
         "summary": summary,
     }
 
-    # Write session log
+    # Flush the final board to the TUI even if an identical write was skipped
+    _schedule_sync(_get_game_state(game_id, game), force=True, board=game.board)
+
+    # Write progress and session log together as one atomic batch
     sessions_dir = _DATA_DIR / "sessions"
     sessions_dir.mkdir(parents=True, exist_ok=True)
     session_file = f"{session_id}.json"
-    tmp_session = sessions_dir / f"{session_file}.tmp"
-    tmp_session.write_text(
-        json.dumps(session_log, indent=2, ensure_ascii=False),
-        encoding="utf-8",
-    )
-    os.replace(tmp_session, sessions_dir / session_file)
+    # Indented: both files are written once per session and read by hand
+    _atomic_write_batch([
+        (progress_path, json.dumps(progress, indent=2, ensure_ascii=False)),
+        (
+            sessions_dir / session_file,
+            json.dumps(session_log, indent=2, ensure_ascii=False),
+        ),
+    ])
+    remember_progress(progress_path, progress)
 
     return minify_save_session({
         "message": f"Session {session_id} saved successfully",
@@ -919,7 +1639,8 @@ def save_session(
 # ---------------------------------------------------------------------------
 
 
-@mcp.tool()
+@_threaded_tool
+@_with_game_lock
 def create_srs_cards_from_game(game_id: str, cp_threshold: int = 80) -> dict:
     """Batch-analyze a completed game and create SRS cards for significant mistakes.
 
@@ -938,9 +1659,9 @@ def create_srs_cards_from_game(game_id: str, cp_threshold: int = 80) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
-    if not board.is_game_over():
+    if _game_result(game) is None:
         return {"error": "Game is not over yet. Finish the game before creating SRS cards."}
 
     # No moves means nothing to analyze
@@ -954,60 +1675,50 @@ def create_srs_cards_from_game(game_id: str, cp_threshold: int = 80) -> dict:
             "card_ids": [],
         }
 
-    # Create fresh engine at full strength for analysis
-    analysis_engine = ChessEngine()
-    analysis_engine.set_difficulty(3000)
-
-    player_color = game["player_color"]
-    player_is_white = player_color == "white"
-
-    replay_board = chess.Board(game["starting_fen"])
-    srs = SRSManager()
+    # Collect the player's positions first so they can be evaluated on
+    # several engines at once; see _evaluate_moves_parallel
+    player_turn = game.player_turn
+    replay_board = board.root()
+    candidates = []
+    for move_number, move in enumerate(board.move_stack, 1):
+        if replay_board.turn == player_turn:
+            candidates.append((move_number, replay_board.copy(), move))
+        replay_board.push(move)
+
+    total_player_moves = len(candidates)
+    evaluations = _evaluate_moves_parallel(
+        [(position, move) for _, position, move in candidates]
+    )
 
     mistakes = []
-    card_ids = []
-    total_player_moves = 0
-    move_number = 0
-
-    try:
-        for move in board.move_stack:
-            move_number += 1
-            is_white_turn = replay_board.turn == chess.WHITE
-
-            # Only evaluate player moves
-            if is_white_turn == player_is_white:
-                total_player_moves += 1
-                evaluation = analysis_engine.evaluate_move(replay_board, move)
-
-                if evaluation.cp_loss >= cp_threshold:
-                    fen = replay_board.fen()
-                    explanation = (
-                        f"Move {move_number}: played {evaluation.move_san} "
-                        f"(best: {evaluation.best_move_san}, cp_loss: {evaluation.cp_loss})"
-                    )
-
-                    card = srs.add_card(
-                        fen=fen,
-                        player_move=evaluation.move_san,
-                        best_move=evaluation.best_move_san,
-                        cp_loss=evaluation.cp_loss,
-                        classification=evaluation.classification,
-                        motif=evaluation.tactical_motif,
-                        explanation=explanation,
-                    )
-                    mistakes.append({
-                        "fen": fen,
-                        "move_number": move_number,
-                        "player_move": evaluation.move_san,
-                        "best_move": evaluation.best_move_san,
-                        "cp_loss": evaluation.cp_loss,
-                        "classification": evaluation.classification,
-                    })
-                    card_ids.append(card["id"])
+    new_cards = []
+    for (move_number, position, _), evaluation in zip(candidates, evaluations):
+        if evaluation.cp_loss < cp_threshold:
+            continue
+
+        mistake = {
+            "fen": position.fen(),
+            "move_number": move_number,
+            "player_move": evaluation.move_san,
+            "best_move": evaluation.best_move_san,
+            "cp_loss": evaluation.cp_loss,
+            "classification": evaluation.classification,
+        }
+        mistakes.append(mistake)
+        new_cards.append({
+            **mistake,
+            "motif": evaluation.tactical_motif,
+            "explanation": (
+                f"Move {move_number}: played {evaluation.move_san} "
+                f"(best: {evaluation.best_move_san}, cp_loss: {evaluation.cp_loss})"
+            ),
+        })
 
-            replay_board.push(move)
-    finally:
-        analysis_engine.close()
+    # Saved together: one rewrite of the card file for the whole game
+    with _srs_lock:
+        srs = _get_srs()
+        card_ids = [card["id"] for card in srs.add_cards(new_cards)]
+        _srs_saved(srs)
 
     return {
         "game_id": game_id,
@@ -1019,7 +1730,243 @@ def create_srs_cards_from_game(game_id: str, cp_threshold: int = 80) -> dict:
     }
 
 
-@mcp.tool()
+# "fen" values in from-games.json; FENs never contain quotes or escapes
+_FEN_FIELD_RE = re.compile(rb'"fen"\s*:\s*"([^"]*)"')
+
+
+def _fen4(fen: bytes) -> bytes:
+    """Cut a FEN down to its first four fields by slicing at the 4th space.
+
+    Args:
+        fen: Full FEN as ASCII bytes.
+
+    Returns:
+        Placement, side to move, castling and en passant fields; the
+        input unchanged if it has four fields or fewer.
+    """
+    end = -1
+    for _ in range(4):
+        end = fen.find(b" ", end + 1)
+        if end < 0:
+            return fen
+    return fen[:end]
+
+
+def _fen_key(fen4: bytes) -> int:
+    """Hash a four-field FEN to the 64-bit key used for puzzle dedup.
+
+    Keys are small ints rather than ~70-character strings, keeping the
+    index compact for large puzzle files. A collision only means one
+    puzzle is skipped, and is vanishingly unlikely at 64 bits.
+
+    Args:
+        fen4: Placement, side to move, castling and en passant fields,
+            space-separated, as ASCII bytes (board.epd() encoded).
+
+    Returns:
+        Unsigned 64-bit key.
+    """
+    return int.from_bytes(hashlib.blake2b(fen4, digest_size=8).digest(), "little")
+
+
+def _file_key(path: Path) -> tuple[int, int] | None:
+    """Return a file's (mtime_ns, size) change key, or None if it is missing.
+
+    Args:
+        path: File to stat.
+
+    Returns:
+        (st_mtime_ns, st_size) tuple, or None if the file can't be stat'ed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_game_puzzles(path: Path) -> tuple[int, frozenset[int]]:
+    """Index from-games.json, reusing the last index if the file is unchanged.
+
+    The file is memory-mapped and its "fen" values are pulled out with a
+    bytes regex, so no puzzle dict is ever built; each puzzle has exactly
+    one "fen" key, so the match count is the puzzle count. FENs are
+    indexed on their first four fields (placement, side to move,
+    castling, en passant), so move clocks don't defeat deduplication, and
+    stored as _fen_key hashes. The index is a frozenset, since it is
+    shared with the cache.
+
+    Args:
+        path: Path to puzzles/from-games.json.
+
+    Returns:
+        (puzzle count, fen key index) tuple; (0, empty set) if the file is
+        missing, empty or unreadable.
+    """
+    key = _file_key(path)
+    if key is None:
+        return 0, frozenset()
+    if _game_puzzles_cache["path"] == path and _game_puzzles_cache["key"] == key:
+        return _game_puzzles_cache["count"], _game_puzzles_cache["fens"]
+    if key[1] == 0:
+        return 0, frozenset()
+
+    import mmap
+
+    count = 0
+    keys: set[int] = set()
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in _FEN_FIELD_RE.finditer(mm):
+                count += 1
+                keys.add(_fen_key(_fen4(match.group(1))))
+    except (OSError, ValueError):
+        return 0, frozenset()
+
+    fens = frozenset(keys)
+    _game_puzzles_cache.update(path=path, key=key, count=count, fens=fens)
+    return count, fens
+
+
+def _json_array_append_offset(f) -> tuple[int, bool]:
+    """Locate where new elements go in a file holding a JSON array.
+
+    Only the tail of the file is read: the offset returned is just past
+    the last non-whitespace byte before the closing bracket, so copying
+    the file up to it and writing a separator, the new elements and "]"
+    extends the array without touching the existing elements.
+
+    Args:
+        f: Seekable binary file object positioned anywhere.
+
+    Returns:
+        (offset, is_empty) tuple; is_empty is True when the array has no
+        elements (the offset then sits just past the opening bracket).
+
+    Raises:
+        ValueError: If the file does not end with a JSON array.
+    """
+    size = f.seek(0, os.SEEK_END)
+    block = 4096
+    while True:
+        start = max(size - block, 0)
+        f.seek(start)
+        tail = f.read(size - start).rstrip()
+        head = tail[:-1].rstrip()
+        if head or start == 0:
+            break
+        block *= 2
+
+    if not tail.endswith(b"]") or not head:
+        raise ValueError("File does not end with a JSON array")
+    return start + len(head), head.endswith(b"[")
+
+
+def _append_game_puzzles(path: Path, new_puzzles: list[dict], existing_count: int) -> int:
+    """Append puzzles to from-games.json without re-encoding existing ones.
+
+    The existing file is byte-copied into a temp file up to its closing
+    bracket, the new puzzles are written in the same layout json.dump
+    uses with indent=2, and the temp file replaces the original.
+
+    Args:
+        path: Path to puzzles/from-games.json.
+        new_puzzles: Puzzle dicts to append (non-empty).
+        existing_count: Number of puzzles already in the file.
+
+    Returns:
+        Total number of puzzles in the file after the write. A missing or
+        malformed file is replaced by a fresh array of new_puzzles.
+    """
+    import shutil
+    import tempfile
+
+    total = existing_count + len(new_puzzles)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(tmp_fd, "wb", buffering=_PUZZLE_WRITE_BUFSIZE) as out:
+            try:
+                with open(path, "rb") as src:
+                    cut, is_empty = _json_array_append_offset(src)
+                    src.seek(0)
+                    shutil.copyfileobj(src, out, _PUZZLE_WRITE_BUFSIZE)
+                out.seek(cut)
+                out.truncate()
+            except (OSError, ValueError):
+                # Missing or malformed file: start a fresh array
+                out.seek(0)
+                out.truncate()
+                out.write(b"[")
+                is_empty = True
+                total = len(new_puzzles)
+
+            # Encode the new puzzles as one indented array in a single
+            # call; minus its "[" it is exactly the text that continues
+            # the existing array after a separating comma
+            encoded = json.dumps(new_puzzles, indent=2, ensure_ascii=False)
+            if not is_empty:
+                out.write(b",")
+            out.write(encoded[1:].encode("utf-8"))
+
+            # The index is refreshed from memory after the write, so the
+            # new file's pages needn't crowd out hotter ones (Linux only)
+            if hasattr(os, "posix_fadvise"):
+                out.flush()
+                os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        os.replace(tmp_path, str(path))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return total
+
+
+def _evaluate_moves_parallel(
+    positions: list[tuple[chess.Board, chess.Move]],
+) -> list[MoveEvaluation]:
+    """Evaluate moves at full strength, spreading them over several engines.
+
+    The shared analysis engine takes one share of the work and up to
+    _PUZZLE_EVAL_WORKERS - 1 warm helper engines take the rest. Stockfish
+    searches in its own process, so plain threads are enough to keep
+    every engine busy.
+
+    Args:
+        positions: (position before the move, move) pairs. Each board is
+            only read, by a single worker.
+
+    Returns:
+        MoveEvaluation for each pair, in input order.
+    """
+    analysis_engine = _get_analysis_engine()
+    workers = min(_PUZZLE_EVAL_WORKERS, len(positions))
+    if workers <= 1:
+        with _analysis_lock:
+            return [analysis_engine.evaluate_move(b, m) for b, m in positions]
+
+    import queue
+    from concurrent.futures import ThreadPoolExecutor
+
+    def evaluate(position: tuple[chess.Board, chess.Move]) -> MoveEvaluation:
+        engine = idle.get()
+        try:
+            return engine.evaluate_move(*position)
+        finally:
+            idle.put(engine)
+
+    # Held for the whole run: the helpers are only ever used from here
+    with _analysis_lock:
+        idle: queue.SimpleQueue[ChessEngine] = queue.SimpleQueue()
+        idle.put(analysis_engine)
+        for engine in _get_helper_engines(workers - 1):
+            idle.put(engine)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(evaluate, positions))
+
+
+@_threaded_tool
+@_with_game_lock
 def generate_puzzles_from_game(game_id: str, cp_threshold: int = 100) -> dict:
     """Generate puzzles from a completed game and append to puzzles/from-games.json.
 
@@ -1038,9 +1985,9 @@ def generate_puzzles_from_game(game_id: str, cp_threshold: int = 100) -> dict:
     if game is None:
         return {"error": f"Game not found: {game_id}"}
 
-    board: chess.Board = game["board"]
+    board: chess.Board = game.board
 
-    if not board.is_game_over():
+    if _game_result(game) is None:
         return {"error": "Game is not over yet. Finish the game first."}
 
     if not board.move_stack:
@@ -1058,103 +2005,114 @@ def generate_puzzles_from_game(game_id: str, cp_threshold: int = 100) -> dict:
     puzzles_dir.mkdir(parents=True, exist_ok=True)
     from_games_path = puzzles_dir / "from-games.json"
 
-    # Load existing puzzles for deduplication
-    existing_puzzles: list[dict] = []
-    if from_games_path.exists():
-        try:
-            with open(from_games_path, encoding="utf-8") as f:
-                existing_puzzles = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            existing_puzzles = []
-
-    existing_fens: set[str] = set()
-    for p in existing_puzzles:
-        fen_parts = p.get("fen", "").split()
-        existing_fens.add(" ".join(fen_parts[:4]))
-
-    # Create analysis engine at full strength
-    analysis_engine = ChessEngine()
-    analysis_engine.set_difficulty(3000)
-
-    player_color = game["player_color"]
-    player_is_white = player_color == "white"
-    replay_board = chess.Board(game["starting_fen"])
-
-    new_puzzles: list[dict] = []
-    move_number = 0
+    with _game_puzzles_lock:
+        # FEN index of existing puzzles for deduplication (cached while the
+        # file is unchanged; frozen, so new FENs go in a separate set)
+        existing_count, existing_fens = _load_game_puzzles(from_games_path)
+        new_fens: set[int] = set()
+
+        # The same moves mined at the same threshold into the file as we left
+        # it can only find duplicates, so skip the replay and engine work
+        played = tuple(board.move_stack)
+        file_key = _file_key(from_games_path)
+        if file_key is not None and game.puzzles_mined == (played, cp_threshold, file_key):
+            return {
+                "game_id": game_id,
+                "puzzles_found": 0,
+                "puzzles_added": 0,
+                "total_game_puzzles": existing_count,
+                "puzzle_file": "puzzles/from-games.json",
+            }
 
-    try:
-        for move in board.move_stack:
-            move_number += 1
-            is_white_turn = replay_board.turn == chess.WHITE
-
-            if is_white_turn == player_is_white and not replay_board.is_game_over():
-                evaluation = analysis_engine.evaluate_move(replay_board, move)
-
-                if evaluation.cp_loss >= cp_threshold:
-                    fen = replay_board.fen()
-                    norm = " ".join(fen.split()[:4])
-
-                    if norm not in existing_fens:
-                        best_move_obj = chess.Move.from_uci(
-                            replay_board.parse_san(evaluation.best_move_san).uci()
-                        )
-                        motif = detect_motif(replay_board, best_move_obj)
-
-                        # Check for checkmate
-                        board_check = replay_board.copy()
-                        board_check.push(best_move_obj)
-                        if board_check.is_checkmate() and motif is None:
-                            motif = "checkmate"
-
-                        puzzle = {
-                            "fen": fen,
-                            "solution_moves": [best_move_obj.uci()],
-                            "solution_san": [evaluation.best_move_san],
-                            "motif": motif or "tactics",
-                            "difficulty": (
-                                "beginner" if evaluation.cp_loss > 300
-                                else "intermediate" if evaluation.cp_loss > 150
-                                else "advanced"
-                            ),
-                            "explanation": (
-                                f"In your game, you played {evaluation.move_san} "
-                                f"(cp_loss: {evaluation.cp_loss}). The best move was "
-                                f"{evaluation.best_move_san}."
-                            ),
-                            "source": "game",
-                            "move_number": move_number,
-                        }
-                        new_puzzles.append(puzzle)
-                        existing_fens.add(norm)
+        player_turn = game.player_turn
+        replay_board = board.root()
+        # Sides alternate, so the player's plies are every other one starting
+        # from the root's side to move (0) or the reply (1)
+        player_parity = 0 if replay_board.turn == player_turn else 1
+
+        # Collect the player's positions first so they can be evaluated on
+        # several engines at once. No position before the final move can be
+        # terminal: the move tools refuse to play on once the game is over.
+        # With a positive cp_threshold, forced moves are skipped without a
+        # search: the only legal move is also the best one, so its cp_loss
+        # is 0 and can never reach the threshold.
+        skip_forced = cp_threshold > 0
+        candidates: list[tuple[int, chess.Board, chess.Move]] = []
+
+        for ply, move in enumerate(board.move_stack):
+            if ply & 1 == player_parity and not (
+                skip_forced and replay_board.legal_moves.count() <= 1
+            ):
+                candidates.append((ply + 1, replay_board.copy(), move))
 
             replay_board.push(move)
-    finally:
-        analysis_engine.close()
 
-    # Append new puzzles and write atomically
-    all_puzzles = existing_puzzles + new_puzzles
-    import tempfile
-
-    tmp_fd, tmp_path = tempfile.mkstemp(
-        dir=str(puzzles_dir), suffix=".tmp",
-    )
-    try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            json.dump(all_puzzles, f, indent=2, ensure_ascii=False)
-        os.replace(tmp_path, str(from_games_path))
-    except Exception:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        raise
+        evaluations = _evaluate_moves_parallel(
+            [(position, move) for _, position, move in candidates]
+        )
+
+        new_puzzles: list[dict] = []
+
+        for (move_number, position, _), evaluation in zip(candidates, evaluations):
+            if evaluation.cp_loss < cp_threshold:
+                continue
+
+            # EPD is exactly the first four FEN fields, hashed into the dedup
+            # key; the full FEN is only built for puzzles actually emitted
+            norm = _fen_key(position.epd().encode("ascii"))
+            if norm in existing_fens or norm in new_fens:
+                continue
+
+            fen = position.fen()
+            best_move_obj = evaluation.best_move
+            # Mates come back as "checkmate" or "back_rank_mate": detect_motif
+            # checks for mate first, on the same post-move board as the rest
+            motif = detect_motif(position, best_move_obj)
+
+            puzzle = {
+                "fen": fen,
+                "solution_moves": [best_move_obj.uci()],
+                "solution_san": [evaluation.best_move_san],
+                "motif": motif or "tactics",
+                "difficulty": (
+                    "beginner" if evaluation.cp_loss > 300
+                    else "intermediate" if evaluation.cp_loss > 150
+                    else "advanced"
+                ),
+                "explanation": (
+                    f"In your game, you played {evaluation.move_san} "
+                    f"(cp_loss: {evaluation.cp_loss}). The best move was "
+                    f"{evaluation.best_move_san}."
+                ),
+                "source": "game",
+                "move_number": move_number,
+            }
+            new_puzzles.append(puzzle)
+            new_fens.add(norm)
+
+        # Splice new puzzles into the file and write atomically (nothing to do
+        # if none); existing puzzles are copied as raw bytes, never re-encoded
+        total = existing_count + len(new_puzzles)
+        if new_puzzles:
+            total = _append_game_puzzles(from_games_path, new_puzzles, existing_count)
+
+            # Our own write is now the cached state; no re-read next time
+            file_key = _file_key(from_games_path)
+            _game_puzzles_cache.update(
+                path=from_games_path,
+                key=file_key,
+                count=total,
+                fens=existing_fens | new_fens,
+            )
+        game.puzzles_mined = (played, cp_threshold, file_key)
 
-    return {
-        "game_id": game_id,
-        "puzzles_found": len(new_puzzles),
-        "puzzles_added": len(new_puzzles),
-        "total_game_puzzles": len(all_puzzles),
-        "puzzle_file": "puzzles/from-games.json",
-    }
+        return {
+            "game_id": game_id,
+            "puzzles_found": len(new_puzzles),
+            "puzzles_added": len(new_puzzles),
+            "total_game_puzzles": total,
+            "puzzle_file": "puzzles/from-games.json",
+        }
 
 
 @mcp.tool()
@@ -1170,8 +2128,8 @@ def srs_to_puzzles(min_cp_loss: int = 100) -> dict:
     Returns:
         Dict with puzzles list, total_cards, exported_count, skipped_count.
     """
-    srs = SRSManager()
-    return srs.export_as_puzzles(min_cp_loss=min_cp_loss)
+    with _srs_lock:
+        return _get_srs().export_as_puzzles(min_cp_loss=min_cp_loss)
 
 
 # ---------------------------------------------------------------------------
@@ -1179,4 +2137,8 @@ def srs_to_puzzles(min_cp_loss: int = 100) -> dict:
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    mcp.run()
+    try:
+        mcp.run()
+    finally:
+        _flush_game_json()
+        _close_analysis_engine()
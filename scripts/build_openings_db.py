@@ -3,7 +3,7 @@
 
 Downloads 5 TSV files from Lichess GitHub, creates:
   - data/openings.db (SQLite with indexes)
-  - data/openings_trie.json (nested dict for fast move lookup)
+  - data/openings_trie.bin (packed trie for fast move lookup)
 
 Usage:
     uv run python scripts/build_openings_db.py
@@ -11,7 +11,6 @@ Usage:
 
 import csv
 import io
-import json
 import os
 import sqlite3
 import sys
@@ -29,7 +28,12 @@ _PROJECT_ROOT = os.path.dirname(_SCRIPT_DIR)
 _DATA_DIR = os.path.join(_PROJECT_ROOT, "data")
 _RAW_DIR = os.path.join(_DATA_DIR, "openings_raw")
 _DB_PATH = os.path.join(_DATA_DIR, "openings.db")
-_TRIE_PATH = os.path.join(_DATA_DIR, "openings_trie.json")
+_TRIE_PATH = os.path.join(_DATA_DIR, "openings_trie.bin")
+
+# Ensure scripts package is importable
+sys.path.insert(0, _PROJECT_ROOT)
+
+from scripts.openings import pack_trie  # noqa: E402
 
 
 def download_tsvs():
@@ -151,9 +155,11 @@ def build_sqlite(openings):
 
 
 def build_trie(openings):
-    """Create a nested dict trie keyed on UCI moves.
+    """Create a trie keyed on UCI moves and write it in packed form.
 
-    Named nodes have '_eco' and '_name' keys.
+    The trie is assembled as nested dicts (named nodes have '_eco' and
+    '_name' keys) and serialized with scripts.openings.pack_trie so the
+    server can mmap it instead of parsing JSON.
     """
     trie = {}
     for opening in openings:
@@ -172,10 +178,10 @@ def build_trie(openings):
 
     # Write atomically
     os.makedirs(_DATA_DIR, exist_ok=True)
-    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=_DATA_DIR)
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".bin", dir=_DATA_DIR)
     try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            json.dump(trie, f, separators=(",", ":"))
+        with os.fdopen(tmp_fd, "wb") as f:
+            f.write(pack_trie(trie))
         os.replace(tmp_path, _TRIE_PATH)
     except Exception:
         if os.path.exists(tmp_path):
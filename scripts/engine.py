@@ -88,18 +88,29 @@ def _classify_move(cp_loss: int) -> tuple[str, bool]:
 class ChessEngine:
     """Stockfish wrapper with adaptive difficulty and analysis."""
 
-    def __init__(self, stockfish_path: str | None = None) -> None:
+    def __init__(
+        self,
+        stockfish_path: str | None = None,
+        hash_mb: int | None = None,
+        threads: int | None = None,
+    ) -> None:
         """Initialize engine with Stockfish.
 
         Args:
             stockfish_path: Explicit path to Stockfish binary.
                 If None, auto-detects from known locations.
+            hash_mb: Transposition table size in MB. If None, Stockfish's
+                default is kept. Reapplied whenever the process restarts.
+            threads: Search threads. If None, Stockfish's default (1) is
+                kept. Reapplied whenever the process restarts.
 
         Raises:
             FileNotFoundError: If Stockfish is not found.
         """
         self._stockfish_path = stockfish_path or _find_stockfish()
-        self._engine = chess.engine.SimpleEngine.popen_uci(self._stockfish_path)
+        self._hash_mb = hash_mb
+        self._threads = threads
+        self._engine = self._open_engine()
         self._target_elo: int = 800
         self._random_pct: float = 0.0
         self._depth: int = 1
@@ -112,7 +123,15 @@ class ChessEngine:
         Returns:
             New SimpleEngine instance.
         """
-        return chess.engine.SimpleEngine.popen_uci(self._stockfish_path)
+        engine = chess.engine.SimpleEngine.popen_uci(self._stockfish_path)
+        options = {}
+        if self._hash_mb is not None:
+            options["Hash"] = self._hash_mb
+        if self._threads is not None:
+            options["Threads"] = self._threads
+        if options:
+            engine.configure(options)
+        return engine
 
     def _ensure_engine(self) -> None:
         """Ensure engine process is alive, restart once if terminated."""
@@ -270,12 +289,9 @@ class ChessEngine:
             mate = score.mate()
 
             pv_moves = info.get("pv", [])
-            # Convert PV moves to SAN notation
-            san_moves: list[str] = []
-            temp_board = board.copy()
-            for move in pv_moves:
-                san_moves.append(temp_board.san(move))
-                temp_board.push(move)
+            # Convert PV moves to SAN notation (SAN needs no move history)
+            temp_board = board.copy(stack=False)
+            san_moves = [temp_board.san_and_push(move) for move in pv_moves]
 
             results.append({
                 "score_cp": cp,
@@ -296,7 +312,8 @@ class ChessEngine:
         then analyzes after the move to compute centipawn loss.
 
         Args:
-            board: Position before the move is played.
+            board: Position before the move is played. Only read, so it
+                may be a game's live board.
             move: The player's move to evaluate.
 
         Returns:
@@ -340,20 +357,16 @@ class ChessEngine:
 
         # Get best line in SAN
         pv_moves = info_before[0].get("pv", [])
-        best_line_san: list[str] = []
         temp_board = board.copy()
-        for pv_move in pv_moves:
-            best_line_san.append(temp_board.san(pv_move))
-            temp_board.push(pv_move)
-
-        # Player's move in SAN (before pushing)
-        move_san = board.san(move)
+        best_line_san = [temp_board.san_and_push(pv_move) for pv_move in pv_moves]
 
-        # Push the player's move
+        # Play the player's move on a copy (SAN is formatted as it is
+        # pushed). The copy keeps the move stack so Stockfish still sees the
+        # game history and can score repetitions as draws. The caller's
+        # board is never changed: it may be a game's live board, read by
+        # other threads meanwhile.
         board_after = board.copy()
-        board_after.push(move)
-
-        # Analyze position after the move
+        move_san = board_after.san_and_push(move)
         info_after = self._engine.analyse(
             board_after,
             chess.engine.Limit(depth=20),
@@ -382,6 +395,7 @@ class ChessEngine:
             is_best=is_best,
             best_line=best_line_san,
             tactical_motif=None,
+            best_move=best_move,
         )
 
     def close(self) -> None:
@@ -81,12 +81,7 @@ def _pick_motif(themes: list[str]) -> str | None:
 
 def _moves_to_san(board: chess.Board, uci_moves: list[str]) -> list[str]:
     """Convert a sequence of UCI moves to SAN, advancing the board."""
-    san_list = []
-    for uci in uci_moves:
-        move = chess.Move.from_uci(uci)
-        san_list.append(board.san(move))
-        board.push(move)
-    return san_list
+    return [board.san_and_push(chess.Move.from_uci(uci)) for uci in uci_moves]
 
 
 def _validate_checkmate(board: chess.Board, solution_uci: list[str]) -> bool:
@@ -1,12 +1,20 @@
 """Shared data models for Chess Speedrun Learning System.
 
 GameState and MoveEvaluation are the shared contract between
-the MCP server and the TUI.
+the MCP server and the TUI. GameRecord is the MCP server's in-memory
+per-game record.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import threading
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import chess
+
+    from scripts.engine import ChessEngine
 
 
 @dataclass
@@ -15,8 +23,10 @@ class GameState:
 
     game_id: str
     fen: str
-    board_display: str
+    # None until rendered for current_game.json
+    board_display: str | None
     move_list: list[str] = field(default_factory=list)
+    move_list_pgn: str | None = None
     last_move: str | None = None
     last_move_san: str | None = None
     eval_score: float | None = None
@@ -24,7 +34,9 @@ class GameState:
     target_elo: int = 800
     is_game_over: bool = False
     result: str | None = None
-    legal_moves: list[str] = field(default_factory=list)
+    # None until listed for current_game.json
+    legal_moves: list[str] | None = field(default_factory=list)
+    legal_moves_count: int = 0
     accuracy: dict = field(default_factory=lambda: {"white": 0.0, "black": 0.0})
     session_number: int = 1
     streak: int = 0
@@ -37,8 +49,16 @@ class GameState:
     is_stalemate: bool = False
     move_annotations: list[dict] = field(default_factory=list)
 
+    def to_dict(self) -> dict:
+        """Return the fields as a dict without copying nested values.
 
-@dataclass
+        Unlike dataclasses.asdict, lists and dicts are shared with the
+        instance rather than deep-copied.
+        """
+        return {name: getattr(self, name) for name in _GAME_STATE_FIELDS}
+
+
+@dataclass(slots=True)
 class MoveEvaluation:
     """Evaluation of a single move compared to the engine's best move."""
 
@@ -51,3 +71,68 @@ class MoveEvaluation:
     is_best: bool
     best_line: list[str] = field(default_factory=list)
     tactical_motif: str | None = None
+    # Set by evaluate_move when the move continues a named opening line
+    is_book: bool = False
+    # Engine's best move as a Move, for callers that need to play it;
+    # not part of the serialized dict
+    best_move: chess.Move | None = None
+
+    def to_dict(self) -> dict:
+        """Return the fields as a dict without copying nested values.
+
+        Unlike dataclasses.asdict, lists and dicts are shared with the
+        instance rather than deep-copied. best_move is omitted.
+        """
+        return {name: getattr(self, name) for name in _MOVE_EVALUATION_FIELDS}
+
+
+@dataclass(slots=True)
+class GameRecord:
+    """In-memory record of one game held by the MCP server.
+
+    The san_list, pgn_str and move_keys caches are kept in step with the
+    board by the server's move helpers; None means "not built yet" and is
+    seeded by replay on first use. state_cache and opening_match are
+    cleared whenever the board changes. Tools hold lock while they read
+    or change the record, since engine-bound tools run on worker threads.
+    """
+
+    board: chess.Board
+    player_color: str
+    target_elo: int
+    # Full six-field FEN as produced by board.fen()
+    starting_fen: str
+    engine: ChessEngine | None = None
+    eval_score: float | None = None
+    accuracy: dict = field(default_factory=lambda: {"white": 0.0, "black": 0.0})
+    session_number: int = 1
+    streak: int = 0
+    lesson_name: str = ""
+    move_evals: list[dict] = field(default_factory=list)
+    # Per-color tallies over move_evals: evaluated moves, and those with
+    # cp_loss <= 30. Kept in step by the server so accuracy is O(1).
+    eval_counts: dict = field(default_factory=lambda: {"white": 0, "black": 0})
+    eval_good: dict = field(default_factory=lambda: {"white": 0, "black": 0})
+    san_list: list[str] | None = None
+    pgn_str: str | None = None
+    move_keys: list[int] | None = None
+    state_cache: dict | None = None
+    opening_match: tuple | None = None
+    # (moves, cp_threshold, from-games.json (mtime, size)) of the last
+    # generate_puzzles_from_game run, so an identical re-run can be skipped
+    puzzles_mined: tuple | None = None
+    # Side the player moves for (chess.WHITE is True), from player_color
+    player_turn: chess.Color = field(init=False)
+    lock: threading.RLock = field(
+        default_factory=threading.RLock, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.player_turn = self.player_color == "white"
+
+
+# Field names in declaration order, resolved once for the to_dict methods
+_GAME_STATE_FIELDS = tuple(f.name for f in fields(GameState))
+_MOVE_EVALUATION_FIELDS = tuple(
+    f.name for f in fields(MoveEvaluation) if f.name != "best_move"
+)
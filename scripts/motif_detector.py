@@ -26,15 +26,14 @@ def _piece_value(piece_type: int) -> int:
     return _PIECE_VALUES.get(piece_type, 0)
 
 
-def _detect_fork(board: chess.Board, move: chess.Move) -> bool:
+def _detect_fork(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move creates a fork.
 
     A fork occurs when the moved piece attacks 2+ enemy pieces
     each worth >= knight value (3 points).
     """
-    board_after = board.copy()
-    board_after.push(move)
-
     to_sq = move.to_square
     moved_piece = board_after.piece_at(to_sq)
     if moved_piece is None:
@@ -55,15 +54,14 @@ def _detect_fork(board: chess.Board, move: chess.Move) -> bool:
     return attacked_valuable >= 2
 
 
-def _detect_pin(board: chess.Board, move: chess.Move) -> bool:
+def _detect_pin(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move creates a pin.
 
     A pin occurs when a sliding piece (bishop, rook, queen) pins
     an enemy piece to their king or queen.
     """
-    board_after = board.copy()
-    board_after.push(move)
-
     to_sq = move.to_square
     moved_piece = board_after.piece_at(to_sq)
     if moved_piece is None:
@@ -94,15 +92,14 @@ def _detect_pin(board: chess.Board, move: chess.Move) -> bool:
     return False
 
 
-def _detect_skewer(board: chess.Board, move: chess.Move) -> bool:
+def _detect_skewer(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move creates a skewer.
 
     A skewer occurs when a sliding piece attacks a valuable piece
     with a less valuable piece behind it on the same ray.
     """
-    board_after = board.copy()
-    board_after.push(move)
-
     to_sq = move.to_square
     moved_piece = board_after.piece_at(to_sq)
     if moved_piece is None:
@@ -167,18 +164,15 @@ def _scan_ray(
     return result
 
 
-def _detect_back_rank_mate(board: chess.Board, move: chess.Move) -> bool:
+def _detect_back_rank_mate(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move delivers a back-rank mate.
 
     Back-rank mate: checkmate on 1st or 8th rank where king is
-    trapped by own pawns.
+    trapped by own pawns. Only called once board_after is known to be
+    checkmate.
     """
-    board_after = board.copy()
-    board_after.push(move)
-
-    if not board_after.is_checkmate():
-        return False
-
     # Find the mated king
     mated_color = board_after.turn  # side to move is in checkmate
     king_sq = board_after.king(mated_color)
@@ -218,7 +212,9 @@ def _detect_back_rank_mate(board: chess.Board, move: chess.Move) -> bool:
     return pawn_blocking
 
 
-def _detect_discovered_attack(board: chess.Board, move: chess.Move) -> bool:
+def _detect_discovered_attack(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move creates a discovered attack.
 
     A discovered attack occurs when moving a piece unblocks a ray
@@ -233,9 +229,6 @@ def _detect_discovered_attack(board: chess.Board, move: chess.Move) -> bool:
     attacker_color = moving_piece.color
     enemy_color = not attacker_color
 
-    board_after = board.copy()
-    board_after.push(move)
-
     # Check if any friendly sliding piece now attacks through the vacated square
     for sq in chess.SQUARES:
         piece = board_after.piece_at(sq)
@@ -266,10 +259,10 @@ def _detect_discovered_attack(board: chess.Board, move: chess.Move) -> bool:
     return False
 
 
-def _detect_double_check(board: chess.Board, move: chess.Move) -> bool:
+def _detect_double_check(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move delivers double check."""
-    board_after = board.copy()
-    board_after.push(move)
 
     if not board_after.is_check():
         return False
@@ -277,61 +270,79 @@ def _detect_double_check(board: chess.Board, move: chess.Move) -> bool:
     return len(board_after.checkers()) >= 2
 
 
-def _detect_promotion(board: chess.Board, move: chess.Move) -> bool:
+def _detect_promotion(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move is a promotion."""
     return move.promotion is not None
 
 
-def _detect_checkmate(board: chess.Board, move: chess.Move) -> bool:
+def _detect_checkmate(
+    board: chess.Board, move: chess.Move, board_after: chess.Board,
+) -> bool:
     """Detect if the move delivers checkmate."""
-    board_after = board.copy()
-    board_after.push(move)
     return board_after.is_checkmate()
 
 
-def detect_all_motifs(board: chess.Board, move: chess.Move) -> list[str]:
-    """Detect all tactical motifs present in the given move.
+def _iter_motifs(board: chess.Board, move: chess.Move):
+    """Yield the move's tactical motifs, most specific first.
+
+    The move is played once on a copy that every detector reads, and
+    motifs are produced lazily for callers that only want the first.
 
     Args:
         board: Board position BEFORE the move is made.
         move: The move to analyze.
 
-    Returns:
-        List of motif name strings. Empty list if no tactical theme.
+    Yields:
+        Motif name strings.
     """
-    motifs: list[str] = []
+    board_after = board.copy(stack=False)
+    board_after.push(move)
 
-    # Order: most specific first
-    if _detect_checkmate(board, move):
-        if _detect_back_rank_mate(board, move):
-            motifs.append("back_rank_mate")
+    if _detect_checkmate(board, move, board_after):
+        if _detect_back_rank_mate(board, move, board_after):
+            yield "back_rank_mate"
         else:
-            motifs.append("checkmate")
+            yield "checkmate"
 
-    if _detect_double_check(board, move):
-        motifs.append("double_check")
+    if _detect_double_check(board, move, board_after):
+        yield "double_check"
 
-    if _detect_discovered_attack(board, move):
-        motifs.append("discovered_attack")
+    if _detect_discovered_attack(board, move, board_after):
+        yield "discovered_attack"
 
-    if _detect_fork(board, move):
-        motifs.append("fork")
+    if _detect_fork(board, move, board_after):
+        yield "fork"
 
-    if _detect_pin(board, move):
-        motifs.append("pin")
+    if _detect_pin(board, move, board_after):
+        yield "pin"
 
-    if _detect_skewer(board, move):
-        motifs.append("skewer")
+    if _detect_skewer(board, move, board_after):
+        yield "skewer"
+
+    if _detect_promotion(board, move, board_after):
+        yield "promotion"
+
+
+def detect_all_motifs(board: chess.Board, move: chess.Move) -> list[str]:
+    """Detect all tactical motifs present in the given move.
 
-    if _detect_promotion(board, move):
-        motifs.append("promotion")
+    Args:
+        board: Board position BEFORE the move is made.
+        move: The move to analyze.
 
-    return motifs
+    Returns:
+        List of motif name strings. Empty list if no tactical theme.
+    """
+    return list(_iter_motifs(board, move))
 
 
 def detect_motif(board: chess.Board, move: chess.Move) -> str | None:
     """Detect the primary tactical motif for the given move.
 
+    Detectors run in priority order and stop at the first motif found.
+
     Args:
         board: Board position BEFORE the move is made.
         move: The move to analyze.
@@ -339,5 +350,4 @@ def detect_motif(board: chess.Board, move: chess.Move) -> str | None:
     Returns:
         The primary motif name string, or None for quiet/positional moves.
     """
-    motifs = detect_all_motifs(board, move)
-    return motifs[0] if motifs else None
+    return next(_iter_motifs(board, move), None)
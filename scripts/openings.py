@@ -1,7 +1,7 @@
 """Opening recognition library using trie lookup and SQLite queries.
 
-Provides fast opening identification via in-memory trie and rich querying
-via SQLite database built by scripts/build_openings_db.py.
+Provides fast opening identification via a packed, memory-mapped trie and
+rich querying via SQLite database built by scripts/build_openings_db.py.
 
 Usage:
     from scripts.openings import OpeningsDB
@@ -10,14 +10,54 @@ Usage:
 """
 
 import json
+import mmap
 import os
 import random
 import sqlite3
+import struct
+import sys
+from array import array
+from bisect import bisect_left
 
 _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _PROJECT_ROOT = os.path.dirname(_SCRIPT_DIR)
 _DEFAULT_DB = os.path.join(_PROJECT_ROOT, "data", "openings.db")
-_DEFAULT_TRIE = os.path.join(_PROJECT_ROOT, "data", "openings_trie.json")
+_DEFAULT_TRIE = os.path.join(_PROJECT_ROOT, "data", "openings_trie.bin")
+
+
+def resolve_trie_path(trie_path):
+    """Return the trie file to load for a packed-trie path.
+
+    Installs built before the packed format only have openings_trie.json
+    next to openings.db; until build_openings_db.py is re-run, that JSON
+    trie is used in place of a missing .bin.
+
+    Args:
+        trie_path: Path to openings_trie.bin (or any trie file).
+
+    Returns:
+        trie_path, or the legacy .json sibling if only that exists.
+    """
+    if not os.path.exists(trie_path) and trie_path.endswith(".bin"):
+        legacy = trie_path[:-len(".bin")] + ".json"
+        if os.path.exists(legacy):
+            return legacy
+    return trie_path
+
+# Packed trie layout (little-endian), produced by pack_trie():
+#   header: magic b"OTRI", u32 root node offset, u32 label table offset,
+#           u32 label count
+#   node:   u16 child count n, u16 label id (0xFFFF if unnamed),
+#           u16 move keys[n] (sorted), padding to 4 bytes,
+#           u32 child node offsets[n]
+#   labels: u32 offsets[count + 1] into a UTF-8 blob of "eco\tname" strings
+# Move keys pack a UCI move into 16 bits: from << 10 | to << 4 | promotion.
+_TRIE_MAGIC = b"OTRI"
+_TRIE_HEADER = struct.Struct("<4sIII")
+_NODE_HEADER = struct.Struct("<HH")
+_NO_LABEL = 0xFFFF
+_PROMOTION_CODES = {"n": 2, "b": 3, "r": 4, "q": 5}
+_PROMOTION_CHARS = {code: char for char, code in _PROMOTION_CODES.items()}
 
 # Common opening families appropriate for beginners (Phase 1: 0-600)
 _BEGINNER_FAMILIES = {
@@ -37,28 +77,229 @@ _BEGINNER_FAMILIES = {
     "Indian Defense",
 }
 
+# Family-name keywords for the color filter in iter_openings_for_level.
+# Defenses are Black's; for Black we also accept gambits and the common
+# named responses to 1.e4/1.d4.
+_DEFENSE_KEYWORDS = ("defense", "defence")
+_BLACK_KEYWORDS = _DEFENSE_KEYWORDS + (
+    "gambit", "indian", "sicilian", "french", "caro", "dutch", "benoni",
+    "pirc", "alekhine", "scandinavian", "philidor", "petrov",
+)
+
+
+def _uci_to_key(uci):
+    """Pack a UCI move string into its 16-bit trie key.
+
+    Returns None for anything that is not a well-formed UCI move, which
+    no trie node can match.
+    """
+    if len(uci) not in (4, 5):
+        return None
+    files = (ord(uci[0]) - 97, ord(uci[2]) - 97)
+    ranks = (ord(uci[1]) - 49, ord(uci[3]) - 49)
+    if not all(0 <= c < 8 for c in files + ranks):
+        return None
+    promotion = _PROMOTION_CODES.get(uci[4:5], 0)
+    if len(uci) == 5 and not promotion:
+        return None
+    from_sq = ranks[0] * 8 + files[0]
+    to_sq = ranks[1] * 8 + files[1]
+    return (from_sq << 10) | (to_sq << 4) | promotion
+
+
+def pack_move(move):
+    """Pack a chess.Move into its 16-bit trie key.
+
+    Args:
+        move: chess.Move (anything with from_square, to_square, promotion).
+
+    Returns:
+        Integer key: from_square << 10 | to_square << 4 | promotion.
+    """
+    return (move.from_square << 10) | (move.to_square << 4) | (move.promotion or 0)
+
+
+def _key_to_uci(key):
+    """Unpack a 16-bit trie key back into a UCI move string."""
+    from_sq = key >> 10
+    to_sq = (key >> 4) & 0x3F
+    return (
+        chr(97 + (from_sq & 7)) + chr(49 + (from_sq >> 3))
+        + chr(97 + (to_sq & 7)) + chr(49 + (to_sq >> 3))
+        + _PROMOTION_CHARS.get(key & 0xF, "")
+    )
+
+
+def _word_view(buf, typecode):
+    """View a little-endian buffer as an array of unsigned words.
+
+    Zero-copy on little-endian hosts; big-endian hosts get a byteswapped
+    copy instead.
+    """
+    size = struct.calcsize(typecode)
+    if sys.byteorder == "little":
+        view = memoryview(buf)
+        return view[:len(view) - len(view) % size].cast(typecode)
+    words = array(typecode, bytes(buf[:len(buf) - len(buf) % size]))
+    words.byteswap()
+    return memoryview(words)
+
+
+def pack_trie(trie):
+    """Serialize a nested dict trie into the packed binary trie format.
+
+    Args:
+        trie: Nested dict keyed on UCI moves; named nodes carry '_eco'
+            and '_name' keys (as built by scripts/build_openings_db.py).
+
+    Returns:
+        Bytes suitable for writing to openings_trie.bin.
+    """
+    out = bytearray(_TRIE_HEADER.size)
+    label_ids = {}
+
+    def _write_node(node):
+        children = sorted(
+            (key, child)
+            for key, child in (
+                (_uci_to_key(move), child)
+                for move, child in node.items()
+                if not move.startswith("_") and isinstance(child, dict)
+            )
+            if key is not None
+        )
+        child_offsets = [_write_node(child) for _, child in children]
+
+        label_id = _NO_LABEL
+        if "_eco" in node and "_name" in node:
+            label = f"{node['_eco']}\t{node['_name']}"
+            label_id = label_ids.setdefault(label, len(label_ids))
+
+        out.extend(b"\0" * (-len(out) % 4))
+        offset = len(out)
+        out.extend(_NODE_HEADER.pack(len(children), label_id))
+        out.extend(struct.pack(f"<{len(children)}H", *(k for k, _ in children)))
+        out.extend(b"\0" * (-len(out) % 4))
+        out.extend(struct.pack(f"<{len(children)}I", *child_offsets))
+        return offset
+
+    root = _write_node(trie)
+    if len(label_ids) >= _NO_LABEL:
+        raise ValueError(f"Too many named openings for packed trie: {len(label_ids)}")
+
+    out.extend(b"\0" * (-len(out) % 4))
+    labels_offset = len(out)
+    blobs = [label.encode("utf-8") for label in label_ids]
+    position = 0
+    offsets = [0]
+    for blob in blobs:
+        position += len(blob)
+        offsets.append(position)
+    out.extend(struct.pack(f"<{len(offsets)}I", *offsets))
+    out.extend(b"".join(blobs))
+
+    _TRIE_HEADER.pack_into(out, 0, _TRIE_MAGIC, root, labels_offset, len(blobs))
+    return bytes(out)
+
+
+class _PackedTrie:
+    """Read-only view over a packed trie buffer (bytes or mmap).
+
+    Nodes are addressed by their byte offset. The buffer is viewed as
+    u16 and u32 arrays so child lookup is a C-level bisect over the
+    node's sorted keys, without building per-node Python objects.
+    """
+
+    def __init__(self, buf):
+        magic, root, labels_offset, count = _TRIE_HEADER.unpack_from(buf, 0)
+        if magic != _TRIE_MAGIC:
+            raise ValueError("Not a packed openings trie")
+        self._buf = buf
+        self.root = root
+        self._u16 = _word_view(buf, "H")
+        self._u32 = _word_view(buf, "I")
+        label_index = labels_offset >> 2
+        self._label_offsets = self._u32[label_index:label_index + count + 1]
+        self._label_base = labels_offset + 4 * (count + 1)
+        self._labels = {}
+        self._line_counts = {}
+
+    def __bool__(self):
+        return self._u16[self.root >> 1] > 0
+
+    def child(self, node, key):
+        """Return the offset of node's child for a move key, or None."""
+        u16 = self._u16
+        keys_at = (node >> 1) + 2
+        keys_end = keys_at + u16[node >> 1]
+        i = bisect_left(u16, key, keys_at, keys_end)
+        if i == keys_end or u16[i] != key:
+            return None
+        # Offsets start at the first 4-byte boundary after the keys.
+        return self._u32[((keys_end + 1) >> 1) + i - keys_at]
+
+    def children(self, node):
+        """Return (move_key, child_offset) pairs for a node, sorted by key."""
+        keys_at = (node >> 1) + 2
+        keys_end = keys_at + self._u16[node >> 1]
+        offsets_at = (keys_end + 1) >> 1
+        keys = self._u16[keys_at:keys_end].tolist()
+        offsets = self._u32[offsets_at:offsets_at + len(keys)].tolist()
+        return list(zip(keys, offsets))
+
+    def line_count(self, node):
+        """Return how many named openings pass through node (memoized)."""
+        count = self._line_counts.get(node)
+        if count is None:
+            count = 0 if self._u16[(node >> 1) + 1] == _NO_LABEL else 1
+            for _, child in self.children(node):
+                count += self.line_count(child)
+            self._line_counts[node] = count
+        return count
+
+    def label(self, node):
+        """Return (eco, name) for a named node, or None."""
+        label_id = self._u16[(node >> 1) + 1]
+        if label_id == _NO_LABEL:
+            return None
+        label = self._labels.get(label_id)
+        if label is None:
+            start = self._label_base + self._label_offsets[label_id]
+            end = self._label_base + self._label_offsets[label_id + 1]
+            eco, name = bytes(self._buf[start:end]).decode("utf-8").split("\t", 1)
+            label = self._labels[label_id] = (eco, name)
+        return label
+
 
 class OpeningsDB:
     """Chess opening recognition and querying.
 
-    Uses an in-memory trie for fast move-sequence lookup and SQLite
-    for rich querying by name, ECO code, family, etc.
+    Uses a packed, memory-mapped trie for fast move-sequence lookup and
+    SQLite for rich querying by name, ECO code, family, etc.
     """
 
     def __init__(self, db_path=None, trie_path=None):
         self._db_path = db_path or _DEFAULT_DB
-        self._trie_path = trie_path or _DEFAULT_TRIE
+        self._trie_path = resolve_trie_path(trie_path or _DEFAULT_TRIE)
         self._trie = self._load_trie()
 
     def _load_trie(self):
-        """Load trie from JSON file. Returns empty dict if unavailable."""
+        """Map the packed trie file read-only. Returns None if unavailable.
+
+        A legacy openings_trie.json (given directly, or found in place of
+        a missing .bin by resolve_trie_path) is parsed and packed in memory.
+        """
         if not os.path.exists(self._trie_path):
-            return {}
+            return None
         try:
-            with open(self._trie_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            return {}
+            if self._trie_path.endswith(".json"):
+                with open(self._trie_path, "r", encoding="utf-8") as f:
+                    return _PackedTrie(pack_trie(json.load(f)))
+            with open(self._trie_path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return _PackedTrie(buf)
+        except (json.JSONDecodeError, OSError, ValueError, struct.error):
+            return None
 
     def _get_conn(self):
         """Open a new SQLite connection (thread-safe pattern)."""
@@ -87,37 +328,88 @@ class OpeningsDB:
             Dict with eco, eco_volume, name, family, pgn, moves_matched keys,
             or None if no match found.
         """
-        if not self._trie or not uci_moves:
+        move_keys = []
+        for move in uci_moves:
+            key = _uci_to_key(move)
+            if key is None:
+                # A malformed move matches nothing, so the walk stops here
+                break
+            move_keys.append(key)
+        return self.identify_opening_keys(move_keys)
+
+    def identify_opening_keys(self, move_keys):
+        """Identify the deepest matching opening for packed move keys.
+
+        Same as identify_opening() but takes moves already packed with
+        pack_move(), which skips building and parsing UCI strings.
+
+        Args:
+            move_keys: List of 16-bit move keys, e.g. from pack_move().
+
+        Returns:
+            Dict with eco, eco_volume, name, family, pgn, moves_matched keys,
+            or None if no match found.
+        """
+        if not self._trie or not move_keys:
             return None
 
-        node = self._trie
-        best_match = None
+        trie = self._trie
+        node = trie.root
+        best_node = None
         moves_matched = 0
 
-        for i, move in enumerate(uci_moves):
-            if move not in node:
+        for i, key in enumerate(move_keys):
+            node = trie.child(node, key)
+            if node is None:
                 break
-            node = node[move]
-            if "_eco" in node and "_name" in node:
-                eco = node["_eco"]
-                name = node["_name"]
-                family = name.split(":")[0].strip() if ":" in name else name
-                best_match = {
-                    "eco": eco,
-                    "eco_volume": eco[0] if eco else "",
-                    "name": name,
-                    "family": family,
-                    "moves_matched": i + 1,
-                }
+            if trie.label(node) is not None:
+                best_node = node
                 moves_matched = i + 1
 
-        # Enrich with PGN from SQLite if we have a match
-        if best_match:
-            best_match["pgn"] = self._get_pgn_for_eco_name(
-                best_match["eco"], best_match["name"]
-            )
+        if best_node is None:
+            return None
+
+        eco, name = trie.label(best_node)
+        family = name.split(":")[0].strip() if ":" in name else name
+        return {
+            "eco": eco,
+            "eco_volume": eco[0] if eco else "",
+            "name": name,
+            "family": family,
+            "moves_matched": moves_matched,
+            # Enrich with PGN from SQLite
+            "pgn": self._get_pgn_for_eco_name(eco, name),
+        }
+
+    def book_moves(self, move_keys):
+        """List the book moves that continue a packed move sequence.
+
+        Args:
+            move_keys: List of 16-bit move keys from the standard starting
+                position, e.g. from pack_move().
+
+        Each move is weighted by how many named openings continue through
+        it, which ranks main lines above rare sidelines.
 
-        return best_match
+        Returns:
+            List of (uci, line_count) tuples, most popular first; empty if
+            the sequence has left the book or the trie is missing.
+        """
+        if not self._trie:
+            return []
+
+        trie = self._trie
+        node = trie.root
+        for key in move_keys:
+            node = trie.child(node, key)
+            if node is None:
+                return []
+        moves = [
+            (_key_to_uci(key), trie.line_count(child))
+            for key, child in trie.children(node)
+        ]
+        moves.sort(key=lambda item: item[1], reverse=True)
+        return moves
 
     def _get_pgn_for_eco_name(self, eco, name):
         """Look up PGN for a specific opening by ECO + name."""
@@ -148,11 +440,12 @@ class OpeningsDB:
         if not self._trie:
             return []
 
-        node = self._trie
+        node = self._trie.root
         for move in uci_moves:
-            if move not in node:
+            key = _uci_to_key(move)
+            node = None if key is None else self._trie.child(node, key)
+            if node is None:
                 return []
-            node = node[move]
 
         results = []
         self._collect_named_children(node, [], results, max_depth=4)
@@ -162,16 +455,13 @@ class OpeningsDB:
         """Recursively collect named nodes up to max_depth from current node."""
         if max_depth <= 0:
             return
-        for key, child in node.items():
-            if key.startswith("_"):
-                continue
-            if not isinstance(child, dict):
-                continue
-            child_path = path + [key]
-            if "_eco" in child and "_name" in child:
+        for key, child in self._trie.children(node):
+            child_path = path + [_key_to_uci(key)]
+            label = self._trie.label(child)
+            if label is not None:
                 results.append({
-                    "eco": child["_eco"],
-                    "name": child["_name"],
+                    "eco": label[0],
+                    "name": label[1],
                     "next_moves": child_path,
                 })
             self._collect_named_children(child, child_path, results, max_depth - 1)
@@ -266,7 +556,7 @@ class OpeningsDB:
         finally:
             conn.close()
 
-    def get_openings_for_level(self, elo):
+    def get_openings_for_level(self, elo, color=None):
         """Get level-appropriate openings based on player Elo.
 
         Phase 1 (0-600): Short openings (<= 4 half-moves) from common families.
@@ -275,38 +565,71 @@ class OpeningsDB:
 
         Args:
             elo: Player's Elo rating.
+            color: Optional 'white' or 'black' to keep only families suited
+                to that side (see iter_openings_for_level).
 
         Returns:
             List of opening dicts appropriate for the level.
         """
+        return list(self.iter_openings_for_level(elo, color=color))
+
+    def iter_openings_for_level(self, elo, color=None):
+        """Lazily yield level-appropriate openings, filtered by color in SQL.
+
+        Rows are fetched from the cursor as the caller consumes them, so a
+        caller that stops early never converts the remaining rows.
+
+        White keeps families that are not defenses; Black keeps defenses,
+        gambits and the common named responses (Sicilian, Indian, ...).
+        Any other color applies no color filter.
+
+        Args:
+            elo: Player's Elo rating (phases as in get_openings_for_level).
+            color: Optional 'white' or 'black'.
+
+        Yields:
+            Opening dicts in level order.
+        """
         conn = self._get_conn()
         if conn is None:
-            return []
+            return
+
+        if elo < 600:
+            # Phase 1: short, common openings
+            placeholders = ",".join("?" for _ in _BEGINNER_FAMILIES)
+            conditions = ["num_moves <= 4", f"family IN ({placeholders})"]
+            params = list(_BEGINNER_FAMILIES)
+            order = "num_moves, name"
+        elif elo < 1000:
+            # Phase 2: medium-length openings
+            conditions = ["num_moves BETWEEN 4 AND 10"]
+            params = []
+            order = "num_moves, name"
+        else:
+            # Phase 3: full access
+            conditions = []
+            params = []
+            order = "eco, name"
+
+        # LIKE is case-insensitive for ASCII, matching the keyword lists
+        if color == "white":
+            conditions.extend("family NOT LIKE ?" for _ in _DEFENSE_KEYWORDS)
+            params.extend(f"%{kw}%" for kw in _DEFENSE_KEYWORDS)
+        elif color == "black":
+            conditions.append(
+                "(" + " OR ".join("family LIKE ?" for _ in _BLACK_KEYWORDS) + ")"
+            )
+            params.extend(f"%{kw}%" for kw in _BLACK_KEYWORDS)
 
+        where = " AND ".join(conditions) if conditions else "1=1"
         try:
-            if elo < 600:
-                # Phase 1: short, common openings
-                placeholders = ",".join("?" for _ in _BEGINNER_FAMILIES)
-                rows = conn.execute(
-                    f"SELECT * FROM openings WHERE num_moves <= 4 "
-                    f"AND family IN ({placeholders}) "
-                    f"ORDER BY num_moves, name",
-                    list(_BEGINNER_FAMILIES),
-                ).fetchall()
-            elif elo < 1000:
-                # Phase 2: medium-length openings
-                rows = conn.execute(
-                    "SELECT * FROM openings WHERE num_moves BETWEEN 4 AND 10 "
-                    "ORDER BY num_moves, name"
-                ).fetchall()
-            else:
-                # Phase 3: full access
-                rows = conn.execute(
-                    "SELECT * FROM openings ORDER BY eco, name"
-                ).fetchall()
-            return [self._row_to_dict(r) for r in rows]
+            cursor = conn.execute(
+                f"SELECT * FROM openings WHERE {where} ORDER BY {order}", params
+            )
+            for row in cursor:
+                yield self._row_to_dict(row)
         except sqlite3.Error:
-            return []
+            return
         finally:
             conn.close()
 
@@ -320,9 +643,26 @@ class OpeningsDB:
         Returns:
             Opening dict, or None if no match or DB unavailable.
         """
+        openings = self.get_random_openings(
+            eco_volume=eco_volume, max_moves=max_moves, limit=1
+        )
+        return openings[0] if openings else None
+
+    def get_random_openings(self, eco_volume=None, max_moves=None, limit=32):
+        """Get a batch of distinct random openings in a single query.
+
+        Args:
+            eco_volume: Optional ECO volume filter (A-E).
+            max_moves: Optional maximum number of half-moves.
+            limit: Maximum number of openings to return.
+
+        Returns:
+            List of opening dicts in random order, or empty list if no
+            match or DB unavailable.
+        """
         conn = self._get_conn()
         if conn is None:
-            return None
+            return []
 
         try:
             conditions = []
@@ -336,11 +676,12 @@ class OpeningsDB:
                 params.append(max_moves)
 
             where = " AND ".join(conditions) if conditions else "1=1"
-            sql = f"SELECT * FROM openings WHERE {where} ORDER BY RANDOM() LIMIT 1"
+            sql = f"SELECT * FROM openings WHERE {where} ORDER BY RANDOM() LIMIT ?"
+            params.append(limit)
 
-            row = conn.execute(sql, params).fetchone()
-            return self._row_to_dict(row) if row else None
+            rows = conn.execute(sql, params).fetchall()
+            return [self._row_to_dict(r) for r in rows]
         except sqlite3.Error:
-            return None
+            return []
         finally:
             conn.close()
@@ -38,6 +38,11 @@ class SRSManager:
         self._cards_path = Path(cards_path)
         self._cards: list[dict] = self._load_cards()
 
+    @property
+    def cards_path(self) -> Path:
+        """Path of the JSON file backing this manager."""
+        return self._cards_path
+
     def _load_cards(self) -> list[dict]:
         """Load cards from disk, handling corruption gracefully.
 
@@ -63,6 +68,7 @@ class SRSManager:
         """Save cards to JSON file with atomic write."""
         self._cards_path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = self._cards_path.with_suffix(".tmp")
+        # Indented: the card file is small, saved rarely and read by users
         tmp_path.write_text(
             json.dumps(self._cards, indent=2, ensure_ascii=False),
             encoding="utf-8",
@@ -93,9 +99,7 @@ class SRSManager:
         Returns:
             The newly created card dict.
         """
-        now = datetime.now(timezone.utc)
-        card: dict = {
-            "id": str(uuid.uuid4()),
+        return self.add_cards([{
             "fen": fen,
             "player_move": player_move,
             "best_move": best_move,
@@ -103,16 +107,45 @@ class SRSManager:
             "classification": classification,
             "motif": motif,
             "explanation": explanation,
-            "created_at": now.isoformat(),
-            "next_review": (now + timedelta(hours=_INTERVAL_HOURS[0])).isoformat(),
-            "interval_hours": _INTERVAL_HOURS[0],
-            "ease_factor": 2.5,
-            "repetitions": 0,
-            "quality_history": [],
-        }
-        self._cards.append(card)
-        self._save()
-        return card
+        }])[0]
+
+    def add_cards(self, mistakes: list[dict]) -> list[dict]:
+        """Add several SRS cards, saving the card file once.
+
+        Args:
+            mistakes: Dicts of add_card's keyword arguments (fen,
+                player_move, best_move, cp_loss, classification and
+                optionally motif and explanation).
+
+        Returns:
+            The newly created card dicts, in input order.
+        """
+        now = datetime.now(timezone.utc)
+        created_at = now.isoformat()
+        next_review = (now + timedelta(hours=_INTERVAL_HOURS[0])).isoformat()
+        cards = [
+            {
+                "id": str(uuid.uuid4()),
+                "fen": mistake["fen"],
+                "player_move": mistake["player_move"],
+                "best_move": mistake["best_move"],
+                "cp_loss": mistake["cp_loss"],
+                "classification": mistake["classification"],
+                "motif": mistake.get("motif"),
+                "explanation": mistake.get("explanation", ""),
+                "created_at": created_at,
+                "next_review": next_review,
+                "interval_hours": _INTERVAL_HOURS[0],
+                "ease_factor": 2.5,
+                "repetitions": 0,
+                "quality_history": [],
+            }
+            for mistake in mistakes
+        ]
+        if cards:
+            self._cards.extend(cards)
+            self._save()
+        return cards
 
     def get_due_cards(self) -> list[dict]:
         """Return all cards whose next_review is at or before now.
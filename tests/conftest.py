@@ -15,6 +15,7 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -83,6 +84,7 @@ def _make_mock_engine():
             is_best=is_best,
             best_line=[best_san],
             tactical_motif=None,
+            best_move=best_move,
         )
 
     def _analyze_position(board: chess.Board, depth: int = 20, multipv: int = 3):
@@ -200,13 +202,18 @@ def clean_data_dir():
 
 
 @pytest.fixture(autouse=True)
-def enable_validation():
+def enable_validation(monkeypatch):
     """Set CHESS_SPEEDRUN_VALIDATE=1 for the test session.
 
-    Restores the original env var value after the test.
+    response_schemas reads the env var once at import, so its cached flag
+    is switched on as well. Restores the original env var value after the
+    test.
     """
     original = os.environ.get("CHESS_SPEEDRUN_VALIDATE")
     os.environ["CHESS_SPEEDRUN_VALIDATE"] = "1"
+    schemas = sys.modules.get("response_schemas")
+    if schemas is not None:
+        monkeypatch.setattr(schemas, "_VALIDATE_ENABLED", True)
     yield
     if original is None:
         os.environ.pop("CHESS_SPEEDRUN_VALIDATE", None)
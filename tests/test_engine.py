@@ -69,6 +69,21 @@ class TestInitialization:
         popen.assert_called()
         assert engine is not None
 
+    def test_hash_size_applied(self, mock_popen):
+        popen, eng = mock_popen
+        ChessEngine(hash_mb=256)
+        eng.configure.assert_any_call({"Hash": 256})
+
+    def test_hash_size_default_untouched(self, mock_popen):
+        popen, eng = mock_popen
+        ChessEngine()
+        assert all("Hash" not in c.args[0] for c in eng.configure.call_args_list)
+
+    def test_threads_applied_with_hash(self, mock_popen):
+        popen, eng = mock_popen
+        ChessEngine(hash_mb=256, threads=4)
+        eng.configure.assert_any_call({"Hash": 256, "Threads": 4})
+
 
 # ---------------------------------------------------------------------------
 # Game management
@@ -245,6 +260,52 @@ class TestEvaluateMove:
 
         assert isinstance(result, MoveEvaluation)
         assert result.move_san == "e4"
+        assert result.best_move == chess.Move.from_uci("e2e4")
+        assert "best_move" not in result.to_dict()
         assert result.tactical_motif is None
         assert isinstance(result.cp_loss, (int, float))
         assert result.classification in ("best", "great", "good", "inaccuracy", "mistake", "blunder")
+
+    def test_leaves_board_unchanged(self, mock_popen):
+        _, eng = mock_popen
+        seen = []
+
+        def mock_analyse(board, limit, multipv=1):
+            seen.append((board, len(board.move_stack)))
+            pov_score = chess.engine.PovScore(chess.engine.Cp(30), board.turn)
+            return [{"score": pov_score, "pv": [next(iter(board.legal_moves))]}]
+
+        eng.analyse = mock_analyse
+
+        engine = ChessEngine()
+        board = chess.Board()
+        board.push_san("e4")
+        fen = board.fen()
+        engine.evaluate_move(board, chess.Move.from_uci("e7e5"))
+
+        assert board.fen() == fen
+        assert len(board.move_stack) == 1
+        # The move was never pushed onto the caller's (possibly shared) board
+        assert all(b is not board or n == 1 for b, n in seen)
+
+    def test_repetition_visible_to_engine(self, mock_popen):
+        _, eng = mock_popen
+
+        # Black is winning unless the position has been repeated three times
+        def mock_analyse(board, limit, multipv=1):
+            cp = 0 if board.is_repetition(3) else 500
+            pov_score = chess.engine.PovScore(chess.engine.Cp(cp), chess.BLACK)
+            return [{"score": pov_score, "pv": [next(iter(board.legal_moves))]}]
+
+        eng.analyse = mock_analyse
+
+        engine = ChessEngine()
+        board = chess.Board()
+        for san in ("Nf3", "Nf6", "Ng1", "Ng8", "Nf3", "Nf6", "Ng1"):
+            board.push_san(san)
+        result = engine.evaluate_move(board, chess.Move.from_uci("f6g8"))
+
+        # Repeating the start position a third time throws the win away
+        assert result.eval_after == 0.0
+        assert result.cp_loss == 500
+        assert result.classification == "blunder"
@@ -75,7 +75,8 @@ def _assert_minified(response: dict) -> None:
 
 
 def _read_tui_json() -> dict:
-    """Read data/current_game.json."""
+    """Flush any coalesced write, then read data/current_game.json."""
+    _server._flush_game_json()
     return json.loads((_DATA_DIR / "current_game.json").read_text(encoding="utf-8"))
 
 
@@ -132,12 +133,15 @@ def _clean_games():
         srs_path.unlink()
 
     for game in _games.values():
-        eng = game.get("engine")
+        eng = game.engine
         if eng is not None:
             try:
                 eng.close()
             except Exception:
                 pass
+    _server._close_analysis_engine()
+    # Drop any parked current_game.json write so it can't land later
+    _server._cancel_pending_sync()
     _games.clear()
 
 
@@ -11,14 +11,19 @@ Run:
 
 from __future__ import annotations
 
+import asyncio
+import errno
 import importlib.util
 import json
 import os
+import stat
 import sys
+import threading
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import chess
+import chess.pgn
 import pytest
 
 # Add project root so imports resolve
@@ -57,6 +62,10 @@ from response_schemas import (
     ERROR_SCHEMA,
     GAME_STATE_SCHEMA,
     MOVE_EVALUATION_SCHEMA,
+    append_pgn_move,
+    drop_last_pgn_move,
+    minify_game_state,
+    moves_to_pgn_string,
     validate_response,
 )
 
@@ -90,7 +99,8 @@ def _assert_minified_game_state(response: dict) -> None:
 
 
 def _read_current_game_json() -> dict:
-    """Read and return data/current_game.json."""
+    """Flush any coalesced write, then read and return data/current_game.json."""
+    _server._flush_game_json()
     path = _DATA_DIR / "current_game.json"
     return json.loads(path.read_text(encoding="utf-8"))
 
@@ -148,12 +158,15 @@ def _clean_games():
         srs_path.unlink()
 
     for game in _games.values():
-        eng = game.get("engine")
+        eng = game.engine
         if eng is not None:
             try:
                 eng.close()
             except Exception:
                 pass
+    _server._close_analysis_engine()
+    # Drop any parked current_game.json write so it can't land later
+    _server._cancel_pending_sync()
     _games.clear()
 
 
@@ -193,6 +206,30 @@ class TestNewGame:
         assert "session_number" in tui
         assert "streak" in tui
         assert "lesson_name" in tui
+        assert tui["board_display"] == str(chess.Board())
+
+    @pytest.mark.parametrize("fen", [
+        chess.STARTING_FEN,
+        "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+        "8/8/8/4k3/8/8/8/4K3 w - - 0 1",
+    ])
+    def test_board_display_matches_str_board(self, fen):
+        assert _server._board_display(fen) == str(chess.Board(fen))
+
+    def test_invalid_fen_starts_no_engine(self):
+        with patch.object(_server, "ChessEngine") as engine_cls:
+            response = new_game(starting_fen="8/8/8/8/8/8/8/8 w - - 0 1")
+        assert response["error"].startswith("Invalid FEN position")
+        engine_cls.assert_not_called()
+
+    def test_fen_parsed_once_per_string(self):
+        fen = "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"
+        first = _server._board_from_fen(fen)
+        with patch.object(_server.chess, "Board", side_effect=AssertionError):
+            second = _server._board_from_fen(fen)
+        assert second is not first
+        assert second.fen() == fen
+        assert "error" in _server._board_from_fen("not a fen")
 
     def test_response_size(self):
         response = new_game()
@@ -214,6 +251,7 @@ class TestGetBoard:
 
     def test_does_not_write_tui_json(self):
         state = new_game()
+        _server._flush_game_json()
         tui_path = _DATA_DIR / "current_game.json"
         # Record mtime after new_game
         mtime_before = tui_path.stat().st_mtime_ns
@@ -221,6 +259,122 @@ class TestGetBoard:
         mtime_after = tui_path.stat().st_mtime_ns
         assert mtime_before == mtime_after, "get_board should NOT write to current_game.json"
 
+    def test_waits_for_game_lock(self):
+        game = _server.GameRecord(
+            board=chess.Board(), player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _games["locked"] = game
+        done = threading.Event()
+        reader = threading.Thread(target=lambda: (get_board("locked"), done.set()))
+
+        # A tool running on a worker thread holds the lock for its search
+        with game.lock:
+            reader.start()
+            assert not done.wait(0.1)
+        assert done.wait(5)
+        reader.join()
+
+    def test_opening_lookup_reused_until_board_changes(self):
+        board = chess.Board()
+        board.push_uci("e2e4")
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        with patch.object(
+            _server._openings_db, "identify_opening_keys", return_value=None
+        ) as lookup:
+            _server._build_game_state("g", game)
+            _server._build_game_state("g", game)
+            assert lookup.call_count == 1
+            _server._push_move(game, chess.Move.from_uci("e7e5"))
+            _server._build_game_state("g", game)
+            assert lookup.call_count == 2
+
+    def test_move_annotations_snapshot_eval_records(self):
+        game = _server.GameRecord(
+            board=chess.Board(), player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        record = {"move": "e4", "classification": "best", "cp_loss": 0,
+                  "ply": 0, "color": "white"}
+        game.move_evals.append(record)
+        annotations = _server._build_game_state("g", game)["move_annotations"]
+        assert annotations == [record]
+        game.move_evals.append(dict(record, ply=1))
+        assert len(annotations) == 1
+
+    def test_game_result_reuses_cached_state(self):
+        board = chess.Board()
+        for uci in ("f2f3", "e7e5", "g2g4", "d8h4"):
+            board.push_uci(uci)
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        assert _server._game_result(game) == "0-1"
+        _server._build_game_state("g", game)
+        with patch.object(chess.Board, "outcome", side_effect=AssertionError):
+            assert _server._game_result(game) == "0-1"
+
+    def test_state_matches_game_state_fields(self):
+        from dataclasses import fields
+
+        from scripts.models import GameState
+
+        game = _server.GameRecord(
+            board=chess.Board(), player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        state = _server._build_game_state("g", game)
+        assert list(state) == [f.name for f in fields(GameState)]
+        assert GameState(**state).to_dict() == state
+
+    def test_legal_moves_listed_only_for_sync(self):
+        board = chess.Board()
+        board.push_san("e4")
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        state = _server._build_game_state("g", game)
+        assert state["legal_moves"] is None
+        assert minify_game_state(state)["legal_moves_count"] == 20
+
+        _server._schedule_sync(state, force=True, board=board)
+        tui = _read_current_game_json()
+        assert tui["legal_moves"] == [board.san(m) for m in board.legal_moves]
+        assert tui["board_display"] == str(board)
+        # The cached state is shared with tool threads: only copies change
+        assert state["legal_moves"] is None
+        assert state["board_display"] is None
+
+    def test_move_keys_follow_push_and_pop(self):
+        board = chess.Board()
+        board.push_uci("e2e4")
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _server._build_game_state("g", game)
+        assert game.move_keys == [_server.pack_move(chess.Move.from_uci("e2e4"))]
+        _server._push_move(game, chess.Move.from_uci("e7e5"))
+        assert game.move_keys == [_server.pack_move(m) for m in board.move_stack]
+        _server._pop_move(game)
+        assert len(game.move_keys) == 1
+
+    def test_replay_san_list_from_custom_start(self):
+        fen = "4k3/8/8/8/8/8/4P3/4K3 b - - 0 1"
+        board = chess.Board(fen)
+        board.push_san("Kd7")
+        board.push_san("e4")
+        game = _server.GameRecord(
+            board=board, player_color="black", target_elo=800,
+            starting_fen=fen,
+        )
+        assert _server._replay_san_list(game) == ["Kd7", "e4"]
+
     def test_error_on_invalid_game(self):
         response = get_board("nonexistent")
         assert "error" in response
@@ -228,6 +382,94 @@ class TestGetBoard:
         assert not errors
 
 
+# ---------------------------------------------------------------------------
+# TestSyncGameJson
+# ---------------------------------------------------------------------------
+
+
+class TestSyncGameJson:
+    """Verify unchanged states are not rewritten to current_game.json."""
+
+    def test_unchanged_state_skips_write(self):
+        tui_path = _DATA_DIR / "current_game.json"
+        state = {"game_id": "sync-test", "fen": chess.STARTING_FEN}
+        _server._sync_game_json(state)
+        mtime_before = tui_path.stat().st_mtime_ns
+        _server._sync_game_json(dict(state))
+        assert tui_path.stat().st_mtime_ns == mtime_before
+
+    def test_rewrites_when_file_removed(self):
+        tui_path = _DATA_DIR / "current_game.json"
+        state = {"game_id": "sync-test", "fen": chess.STARTING_FEN}
+        _server._sync_game_json(state)
+        tui_path.unlink()
+        _server._sync_game_json(state)
+        assert _read_current_game_json()["game_id"] == "sync-test"
+
+    def test_state_sync_skips_fsync(self):
+        state = {"game_id": "no-fsync", "fen": chess.STARTING_FEN}
+        with patch.object(_server.os, "fsync", side_effect=AssertionError):
+            _server._sync_game_json(state, force=True)
+        assert _read_current_game_json()["game_id"] == "no-fsync"
+        assert not (_DATA_DIR / "current_game.json.tmp").exists()
+
+    def test_durable_sync_is_written_at_once_and_fsynced(self):
+        _server._schedule_sync({"game_id": "first"}, force=True)
+        with patch.object(_server.os, "fsync", wraps=os.fsync) as fsync:
+            # Inside the debounce window, but durable states are not parked
+            _server._schedule_sync({"game_id": "durable"}, durable=True)
+        assert fsync.call_count == 2  # the file, then its directory
+        assert _server._pending_sync["timer"] is None
+        tui = json.loads((_DATA_DIR / "current_game.json").read_text(encoding="utf-8"))
+        assert tui["game_id"] == "durable"
+
+    @pytest.mark.parametrize("code", [errno.ENOTSUP, errno.EINVAL])
+    def test_unsupported_directory_fsync_is_ignored(self, tmp_path, code):
+        def fsync(fd):
+            if stat.S_ISDIR(os.fstat(fd).st_mode):
+                raise OSError(code, os.strerror(code))
+
+        target = tmp_path / "state.json"
+        with patch.object(_server.os, "fsync", side_effect=fsync):
+            _server._atomic_write_batch([(target, "{}")])
+        assert target.read_text(encoding="utf-8") == "{}"
+
+    def test_directory_fsync_errors_still_raise(self, tmp_path):
+        def fsync(fd):
+            if stat.S_ISDIR(os.fstat(fd).st_mode):
+                raise OSError(errno.EIO, os.strerror(errno.EIO))
+
+        with patch.object(_server.os, "fsync", side_effect=fsync):
+            with pytest.raises(OSError):
+                _server._atomic_write_batch([(tmp_path / "state.json", "{}")])
+
+    def test_burst_is_coalesced(self):
+        tui_path = _DATA_DIR / "current_game.json"
+        _server._schedule_sync({"game_id": "burst", "ply": 0}, force=True)
+        mtime_before = tui_path.stat().st_mtime_ns
+        # Within the debounce window: parked, not written
+        _server._schedule_sync({"game_id": "burst", "ply": 1})
+        _server._schedule_sync({"game_id": "burst", "ply": 2})
+        assert tui_path.stat().st_mtime_ns == mtime_before
+        # The latest parked state is what lands
+        assert _read_current_game_json()["ply"] == 2
+
+    def test_game_end_writes_pgn_with_final_state(self):
+        fen = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+        state = set_position(fen)
+        with patch.object(
+            _server, "_atomic_write_batch", wraps=_server._atomic_write_batch
+        ) as batch:
+            make_move(state["game_id"], "Qxf7#")
+        # Not debounced: the final board and the PGN go out in one batch
+        assert batch.call_count == 1
+        (tui_path, _), (pgn_path, pgn_text) = batch.call_args.args[0]
+        assert tui_path.name == "current_game.json"
+        assert pgn_path.suffix == ".pgn"
+        assert pgn_text.rstrip().endswith("1-0")
+        assert pgn_path.exists()
+
+
 # ---------------------------------------------------------------------------
 # TestMakeMove
 # ---------------------------------------------------------------------------
@@ -259,6 +501,12 @@ class TestMakeMove:
         response = make_move(state["game_id"], "Qd8")
         assert "error" in response
 
+    def test_error_on_null_move(self):
+        state = new_game()
+        response = make_move(state["game_id"], "--")
+        assert "error" in response
+        assert get_board(state["game_id"])["move_list"] == ""
+
 
 # ---------------------------------------------------------------------------
 # TestEngineMove
@@ -274,6 +522,38 @@ class TestEngineMove:
         response = engine_move(state["game_id"])
         _assert_minified_game_state(response)
 
+    def test_book_reply_skips_engine(self):
+        board = chess.Board()
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=1600,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _games["book-test"] = game
+        _server._push_move(game, chess.Move.from_uci("e2e4"))
+        with patch.object(
+            _server._openings_db, "book_moves",
+            return_value=[("e7e5", 10), ("c7c5", 9), ("a7a6", 1)],
+        ):
+            engine_move("book-test")
+        assert board.move_stack[-1].uci() in ("e7e5", "c7c5")
+        assert game.engine is None
+
+    def test_weak_engine_ignores_book(self):
+        board = chess.Board()
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _games["book-test"] = game
+        _server._push_move(game, chess.Move.from_uci("e2e4"))
+        engine = MagicMock()
+        engine.get_engine_move.return_value = chess.Move.from_uci("a7a6")
+        with patch.object(
+            _server._openings_db, "book_moves", return_value=[("e7e5", 10)],
+        ), patch.object(_server, "_get_engine", return_value=engine):
+            engine_move("book-test")
+        assert board.move_stack[-1].uci() == "a7a6"
+
     def test_syncs_full_state_to_json(self):
         state = new_game()
         make_move(state["game_id"], "e4")
@@ -312,6 +592,36 @@ class TestAnalyzePosition:
         errors = validate_response(response, ANALYSIS_SCHEMA)
         assert not errors
 
+    @pytest.mark.parametrize("name, is_async", [
+        ("analyze_position", True),
+        ("engine_move", True),
+        ("evaluate_move", True),
+        ("create_srs_cards_from_game", True),
+        # Tools that wait on a game's lock must not do so on the loop
+        ("get_board", True),
+        ("make_move", True),
+        ("save_session", True),
+        ("set_position", False),
+    ])
+    def test_engine_tools_registered_async(self, name, is_async):
+        tool = _server.mcp._tool_manager.get_tool(name)
+        assert tool.is_async is is_async
+        # The wrapper keeps the tool's own parameter schema
+        assert "args" not in tool.parameters["properties"]
+
+    def test_runs_on_worker_thread(self):
+        seen = []
+        real = _server._board_from_fen
+
+        def record(fen):
+            seen.append(threading.current_thread())
+            return real(fen)
+
+        with patch.object(_server, "_board_from_fen", side_effect=record):
+            asyncio.run(_server.mcp.call_tool("analyze_position", {"fen": "bad"}))
+
+        assert seen and seen[0] is not threading.main_thread()
+
 
 # ---------------------------------------------------------------------------
 # TestEvaluateMove
@@ -343,6 +653,50 @@ class TestEvaluateMove:
         errors = validate_response(response, MOVE_EVALUATION_SCHEMA)
         assert not errors
 
+    def test_parked_state_not_mutated(self):
+        game = _server.GameRecord(
+            board=chess.Board(), player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _games["eval-test"] = game
+        before = _server._get_game_state("eval-test", game)
+        snapshot = dict(before)
+        engine = MagicMock()
+        engine.evaluate_move.return_value = _server.MoveEvaluation(
+            move_san="e4", best_move_san="e4", cp_loss=0, eval_before=30.0,
+            eval_after=30.0, classification="best", is_best=True,
+        )
+        with patch.object(_server, "_get_engine", return_value=engine):
+            evaluate_move("eval-test", "e4")
+
+        assert before == snapshot
+        after = game.state_cache
+        assert after is not before
+        assert after["accuracy"]["white"] == 100.0
+        assert len(after["move_annotations"]) == 1
+
+    @pytest.mark.parametrize("move, is_book", [("e4", True), ("a3", False)])
+    def test_book_move_keeps_engine_evaluation(self, move, is_book):
+        board = chess.Board()
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _games["book-test"] = game
+        engine = MagicMock()
+        engine.evaluate_move.return_value = _server.MoveEvaluation(
+            move_san=move, best_move_san="e4", cp_loss=12, eval_before=30.0,
+            eval_after=18.0, classification="great", is_best=False,
+        )
+        with patch.object(
+            _server._openings_db, "book_moves",
+            return_value=[("e2e4", 10), ("d2d4", 8)],
+        ), patch.object(_server, "_get_engine", return_value=engine):
+            response = evaluate_move("book-test", move)
+        assert response["is_book"] is is_book
+        assert response["classification"] == "great"
+        assert (response["eval_before"], response["eval_after"]) == (30.0, 18.0)
+
 
 # ---------------------------------------------------------------------------
 # TestSetDifficulty
@@ -390,6 +744,38 @@ class TestGetGamePgn:
         assert isinstance(response["pgn"], str)
         assert "e4" in response["pgn"]
 
+    def test_custom_start_has_fen_header(self):
+        fen = "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"
+        state = set_position(fen)
+        make_move(state["game_id"], "e4")
+        pgn = get_game_pgn(state["game_id"])["pgn"]
+        assert f'[FEN "{fen}"]' in pgn
+        assert "1. e4" in pgn
+
+    def test_partial_fen_is_normalized(self):
+        state = set_position("4k3/8/8/8/8/8/4P3/4K3 w - -")
+        pgn = get_game_pgn(state["game_id"])["pgn"]
+        assert '[FEN "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"]' in pgn
+
+    @pytest.mark.parametrize("fen, ucis", [
+        (chess.STARTING_FEN, []),
+        (chess.STARTING_FEN, ["e2e4", "e7e5", "g1f3"]),
+        (chess.STARTING_FEN, ["f2f3", "e7e5", "g2g4", "d8h4"]),
+        ("4k3/8/8/8/8/8/4P3/4K3 b - - 3 12", ["e8d7", "e2e4", "d7e6"]),
+    ])
+    def test_export_matches_python_chess(self, fen, ucis):
+        board = chess.Board(fen)
+        for uci in ucis:
+            board.push_uci(uci)
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800, starting_fen=fen,
+        )
+        headers = {"Event": "Chess Speedrun", "White": "Player"}
+        expected = chess.pgn.Game.from_board(board)
+        for name, value in headers.items():
+            expected.headers[name] = value
+        assert _server._export_pgn(game, headers) == str(expected)
+
     def test_error_invalid_game(self):
         response = get_game_pgn("nonexistent")
         assert "error" in response
@@ -413,12 +799,30 @@ class TestGetLegalMoves:
         state = new_game()
         response = get_legal_moves(state["game_id"], square="e2")
         assert isinstance(response["legal_moves"], list)
-        assert len(response["legal_moves"]) == 2  # e3, e4
+        assert sorted(response["legal_moves"]) == ["e3", "e4"]
+
+    @pytest.mark.parametrize("square", ["e4", "e7"])
+    def test_filtered_by_empty_or_opponent_square(self, square):
+        state = new_game()
+        response = get_legal_moves(state["game_id"], square=square)
+        assert response["legal_moves"] == []
 
     def test_error_invalid_game(self):
         response = get_legal_moves("nonexistent")
         assert "error" in response
 
+    def test_legal_sans_cached_per_position(self):
+        board = chess.Board()
+        first = _server._legal_sans(board)
+        assert len(first) == 20
+        # Same position reached by a different move order hits the cache
+        transposed = chess.Board()
+        for uci in ("g1f3", "g8f6", "f3g1", "f6g8"):
+            transposed.push_uci(uci)
+        assert _server._legal_sans(transposed) is first
+        board.push_uci("e2e4")
+        assert "e5" in _server._legal_sans(board)
+
 
 # ---------------------------------------------------------------------------
 # TestUndoMove
@@ -448,6 +852,32 @@ class TestUndoMove:
         response = undo_move(state["game_id"])
         assert "error" in response
 
+    def test_undo_drops_stale_eval_tallies(self):
+        board = chess.Board()
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        evals = [
+            {"color": "white", "cp_loss": 0, "ply": 0},
+            {"color": "black", "cp_loss": 120, "ply": 1},
+            {"color": "white", "cp_loss": 200, "ply": 2},
+            {"color": "black", "cp_loss": 10, "ply": 3},
+        ]
+        for uci, ev in zip(("e2e4", "e7e5", "g1f3", "b8c6"), evals):
+            _server._push_move(game, chess.Move.from_uci(uci))
+            game.move_evals.append(ev)
+            _server._tally_eval(game, ev, 1)
+        _games["tally-test"] = game
+
+        undo_move("tally-test")
+
+        assert [ev["ply"] for ev in game.move_evals] == [0, 1]
+        assert game.accuracy == {"white": 100.0, "black": 0.0}
+        incremental = (dict(game.eval_counts), dict(game.eval_good))
+        _server._recompute_accuracy(game)
+        assert (game.eval_counts, game.eval_good) == incremental
+
 
 # ---------------------------------------------------------------------------
 # TestSetPosition
@@ -514,6 +944,31 @@ class TestSaveSession:
         session_file = sessions_dir / "session_001.json"
         assert session_file.exists()
 
+    def test_files_written_readable(self):
+        state = new_game()
+        save_session(state["game_id"], estimated_elo=500)
+        progress_text = (_DATA_DIR / "progress.json").read_text(encoding="utf-8")
+        session_text = (_DATA_DIR / "sessions" / "session_001.json").read_text(
+            encoding="utf-8"
+        )
+        # Written once per session and read by people: kept indented
+        assert progress_text.startswith('{\n  "')
+        assert session_text.startswith('{\n  "')
+        assert json.loads(progress_text)["current_elo"] == 500
+        assert json.loads(session_text)["game_id"] == state["game_id"]
+
+    def test_written_progress_is_cached(self, monkeypatch):
+        state = new_game()
+        save_session(state["game_id"], estimated_elo=500)
+        progress_cache = sys.modules["progress_cache"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("progress.json re-read after save_session")
+
+        monkeypatch.setattr(progress_cache.json, "loads", fail)
+        progress = progress_cache.load_progress(_DATA_DIR / "progress.json")
+        assert progress["current_elo"] == 500
+
     def test_error_invalid_game(self):
         response = save_session("nonexistent")
         assert "error" in response
@@ -552,6 +1007,24 @@ class TestCreateSrsCards:
         result = create_srs_cards_from_game("nonexistent")
         assert "error" in result
 
+    def test_srs_manager_shared_until_file_changes(self):
+        first = _server._get_srs()
+        assert _server._get_srs() is first
+
+        # A save recorded through _srs_saved keeps the instance
+        first._save()
+        _server._srs_saved(first)
+        assert _server._get_srs() is first
+
+        # An outside rewrite (e.g. the srs.py CLI) forces a reload
+        path = first.cards_path
+        path.write_text("[]", encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        reloaded = _server._get_srs()
+        assert reloaded is not first
+        assert reloaded.get_stats()["total"] == 0
+
 
 # ---------------------------------------------------------------------------
 # TestResponseSchemas
@@ -597,3 +1070,26 @@ class TestResponseSchemas:
         response = save_session("nonexistent")
         errors = validate_response(response, ERROR_SCHEMA)
         assert not errors
+
+
+# ---------------------------------------------------------------------------
+# TestPgnMoveText
+# ---------------------------------------------------------------------------
+
+
+class TestPgnMoveText:
+    """Incremental PGN move text must match a full rebuild."""
+
+    _MOVES = ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4"]
+
+    def test_append_matches_rebuild(self):
+        pgn = ""
+        for ply, san in enumerate(self._MOVES):
+            pgn = append_pgn_move(pgn, ply, san)
+            assert pgn == moves_to_pgn_string(self._MOVES[: ply + 1])
+
+    def test_drop_matches_rebuild(self):
+        pgn = moves_to_pgn_string(self._MOVES)
+        for ply in range(len(self._MOVES) - 1, -1, -1):
+            pgn = drop_last_pgn_move(pgn)
+            assert pgn == moves_to_pgn_string(self._MOVES[:ply])
@@ -8,7 +8,7 @@ Covers:
 - Quiz tracking in progress.json
 - Live game current_opening integration
 
-Requires data/openings.db and data/openings_trie.json to exist
+Requires data/openings.db and data/openings_trie.bin to exist
 (run: uv run python scripts/build_openings_db.py).
 """
 
@@ -20,13 +20,14 @@ import os
 import sys
 from pathlib import Path
 
+import chess
 import pytest
 
 # Add project root so imports resolve
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(_PROJECT_ROOT))
 
-from scripts.openings import OpeningsDB
+from scripts.openings import OpeningsDB, pack_move, pack_trie
 
 # Import server module from hyphenated directory via importlib
 _server_path = _PROJECT_ROOT / "mcp-server" / "server.py"
@@ -50,6 +51,8 @@ _ot_spec = importlib.util.spec_from_file_location(
 _ot_mod = importlib.util.module_from_spec(_ot_spec)
 _ot_spec.loader.exec_module(_ot_mod)
 
+from response_schemas import moves_to_pgn_string  # noqa: E402
+
 # The MCP tools are registered on _server.mcp — access them via _server
 identify_opening = _server.mcp._tool_manager._tools.get("identify_opening")
 search_openings = _server.mcp._tool_manager._tools.get("search_openings")
@@ -107,12 +110,15 @@ def _clean_data():
 
     # Close all engine processes before clearing game store
     for game in _games.values():
-        engine = game.get("engine")
+        engine = game.engine
         if engine is not None:
             try:
                 engine.close()
             except Exception:
                 pass
+    _server._close_analysis_engine()
+    # Drop any parked current_game.json write so it can't land later
+    _server._cancel_pending_sync()
 
     _games.clear()
 
@@ -223,6 +229,14 @@ class TestSQLiteQueries:
         # Phase 3 (1000+) gets full access — should be more openings
         assert len(results_1200) > len(results_400)
 
+    def test_level_color_filter(self, openings_db):
+        """Color filter should drop defenses for White and keep them for Black."""
+        white = openings_db.get_openings_for_level(1200, color="white")
+        black = openings_db.get_openings_for_level(1200, color="black")
+        assert white and black
+        assert not any("Defense" in o["family"] for o in white)
+        assert any("Defense" in o["family"] for o in black)
+
     def test_get_random_opening(self, openings_db):
         """get_random_opening should return a valid opening dict."""
         result = openings_db.get_random_opening()
@@ -237,12 +251,102 @@ class TestSQLiteQueries:
         assert result is not None
         assert result["eco_volume"] == "B"
 
+    def test_get_random_openings_batch(self, openings_db):
+        """get_random_openings should return distinct rows within filters."""
+        results = openings_db.get_random_openings(max_moves=4, limit=10)
+        assert 0 < len(results) <= 10
+        assert all(r["num_moves"] <= 4 for r in results)
+        assert len({r["id"] for r in results}) == len(results)
+
     def test_search_with_limit(self, openings_db):
         """Search with limit should respect max results."""
         results = openings_db.search_openings("Defense", limit=5)
         assert len(results) <= 5
 
 
+# ── Packed Trie Tests ───────────────────────────────────────────────
+
+
+class TestPackedTrie:
+    """Test the packed binary trie format independently of built data."""
+
+    _TRIE = {
+        "e2e4": {
+            "_eco": "B00",
+            "_name": "King's Pawn Game",
+            "c7c5": {"_eco": "B20", "_name": "Sicilian Defense"},
+            "e7e5": {"g1f3": {"_eco": "C40", "_name": "King's Knight Opening"}},
+        },
+        "a2a4": {"b7b5": {"a4b5": {"a7a6": {"b5a6": {"b8a6": {}}}}}},
+        "e7e8q": {"_eco": "A00", "_name": "Promotion: Test"},
+    }
+
+    @pytest.fixture()
+    def packed_db(self, tmp_path):
+        trie_path = tmp_path / "openings_trie.bin"
+        trie_path.write_bytes(pack_trie(self._TRIE))
+        return OpeningsDB(
+            db_path=str(tmp_path / "missing.db"),
+            trie_path=str(trie_path),
+        )
+
+    def test_identifies_deepest_named_node(self, packed_db):
+        result = packed_db.identify_opening(["e2e4", "e7e5", "g1f3", "b8c6"])
+        assert result["eco"] == "C40"
+        assert result["name"] == "King's Knight Opening"
+        assert result["moves_matched"] == 3
+
+    def test_unnamed_path_returns_none(self, packed_db):
+        assert packed_db.identify_opening(["a2a4", "b7b5"]) is None
+
+    @pytest.mark.parametrize("moves", [
+        ["e2e4", "e7"], ["e2e4", "e7e9"], ["e2e4", "z7e5"], ["e2e4", "e7e8k"],
+    ])
+    def test_malformed_uci_matches_nothing(self, packed_db, moves):
+        # The walk stops at the bad move, like any move the book lacks
+        assert packed_db.identify_opening(moves)["eco"] == "B00"
+        assert packed_db.get_continuations(moves) == []
+
+    def test_legacy_json_trie_used_when_bin_missing(self, tmp_path):
+        (tmp_path / "openings_trie.json").write_text(
+            json.dumps(self._TRIE), encoding="utf-8"
+        )
+        db = OpeningsDB(
+            db_path=str(tmp_path / "missing.db"),
+            trie_path=str(tmp_path / "openings_trie.bin"),
+        )
+        assert db.identify_opening(["e2e4", "e7e5", "g1f3"])["eco"] == "C40"
+
+    def test_promotion_moves_are_distinct_keys(self, packed_db):
+        assert packed_db.identify_opening(["e7e8q"])["eco"] == "A00"
+        assert packed_db.identify_opening(["e7e8n"]) is None
+
+    def test_identify_by_packed_move_keys(self, packed_db):
+        keys = [pack_move(chess.Move.from_uci(u)) for u in ["e2e4", "c7c5"]]
+        assert packed_db.identify_opening_keys(keys)["eco"] == "B20"
+        assert packed_db.identify_opening_keys(keys) == packed_db.identify_opening(
+            ["e2e4", "c7c5"]
+        )
+
+    def test_continuations_decode_moves(self, packed_db):
+        names = {
+            c["name"]: c["next_moves"] for c in packed_db.get_continuations(["e2e4"])
+        }
+        assert names["Sicilian Defense"] == ["c7c5"]
+        assert names["King's Knight Opening"] == ["e7e5", "g1f3"]
+
+    def test_book_moves_ranked_by_line_count(self, packed_db):
+        key = pack_move(chess.Move.from_uci("e2e4"))
+        assert packed_db.book_moves([key]) == [("c7c5", 1), ("e7e5", 1)]
+        first = packed_db.book_moves([])
+        assert first[0] == ("e2e4", 3)
+        assert dict(first)["a2a4"] == 0
+
+    def test_book_moves_out_of_book(self, packed_db):
+        key = pack_move(chess.Move.from_uci("d2d4"))
+        assert packed_db.book_moves([key]) == []
+
+
 # ── Graceful Degradation Tests ──────────────────────────────────────
 
 
@@ -261,6 +365,7 @@ class TestGracefulDegradation:
         assert db.get_opening_lines("Italian Game") == []
         assert db.get_openings_for_level(400) == []
         assert db.get_random_opening() is None
+        assert db.get_random_openings() == []
         assert db.get_continuations(["e2e4"]) == []
 
     def test_nonexistent_trie_only(self):
@@ -401,6 +506,17 @@ class TestMCPOpeningQuiz:
         # The game should exist in _games dict
         assert result["game_id"] in _games
 
+    def test_quiz_game_caches_match_replay(self):
+        """The quiz game's move caches should match a replay of its board."""
+        result = _call_tool(opening_quiz, difficulty="beginner")
+        if "error" in result:
+            pytest.skip(result["error"])
+        game = _games[result["game_id"]]
+
+        assert game.san_list == _server._replay_san_list(game)
+        assert game.pgn_str == moves_to_pgn_string(result["moves_so_far"])
+        assert game.move_keys == [pack_move(m) for m in game.board.move_stack]
+
     def test_quiz_with_eco(self):
         """opening_quiz with specific ECO should use that opening family."""
         result = _call_tool(opening_quiz, eco="B20", difficulty="beginner")
@@ -434,13 +550,13 @@ class TestMCPToolsDBNotBuilt:
     def _hide_db_files(self, tmp_path):
         """Temporarily rename DB files to simulate missing DB."""
         db_path = _DATA_DIR / "openings.db"
-        trie_path = _DATA_DIR / "openings_trie.json"
+        trie_path = _DATA_DIR / "openings_trie.bin"
 
         db_exists = db_path.exists()
         trie_exists = trie_path.exists()
 
         db_backup = _DATA_DIR / "openings.db.bak"
-        trie_backup = _DATA_DIR / "openings_trie.json.bak"
+        trie_backup = _DATA_DIR / "openings_trie.bin.bak"
 
         if db_exists:
             os.rename(db_path, db_backup)
@@ -100,12 +100,15 @@ def _clean_data():
 
     # Close all engine processes before clearing game store
     for game in _games.values():
-        engine = game.get("engine")
+        engine = game.engine
         if engine is not None:
             try:
                 engine.close()
             except Exception:
                 pass
+    _server._close_analysis_engine()
+    # Drop any parked current_game.json write so it can't land later
+    _server._cancel_pending_sync()
 
     _games.clear()
 
@@ -265,6 +268,142 @@ class TestCreateSRSCardsFromGame:
         assert "error" in result
 
 
+class TestGamePuzzleIndex:
+    """Test the cached from-games.json FEN-key index."""
+
+    def test_index_reused_until_file_changes(self, tmp_path):
+        path = tmp_path / "from-games.json"
+        path.write_text(json.dumps([
+            {"fen": "8/8/8/8/8/8/4P3/4K2k w - - 3 40"},
+        ]), encoding="utf-8")
+
+        count, fens = _server._load_game_puzzles(path)
+        assert count == 1
+        assert fens == {_server._fen_key(b"8/8/8/8/8/8/4P3/4K2k w - -")}
+        assert _server._load_game_puzzles(path)[1] is fens
+
+        path.write_text(json.dumps([
+            {"fen": "8/8/8/8/8/8/4P3/4K2k w - - 3 40"},
+            {"fen": "8/8/8/8/8/8/4P3/4K1k1 b - - 0 1"},
+        ]), encoding="utf-8")
+        assert _server._load_game_puzzles(path)[0] == 2
+
+    def test_missing_file_is_empty(self, tmp_path):
+        assert _server._load_game_puzzles(tmp_path / "none.json") == (0, frozenset())
+
+    def test_index_keys_match_board_epd(self, tmp_path):
+        import chess
+
+        board = chess.Board()
+        for san in ("e4", "d5", "e5", "f5"):
+            board.push_san(san)
+        path = tmp_path / "from-games.json"
+        path.write_text(json.dumps([{"fen": board.fen()}]), encoding="utf-8")
+
+        assert _server._load_game_puzzles(path)[1] == {
+            _server._fen_key(board.epd().encode("ascii"))
+        }
+
+    def test_fen4(self):
+        assert _server._fen4(b"8/8/8/8/8/8/4P3/4K2k w - e3 0 1") == (
+            b"8/8/8/8/8/8/4P3/4K2k w - e3"
+        )
+        assert _server._fen4(b"8/8/8/8/8/8/4P3/4K2k w - -") == (
+            b"8/8/8/8/8/8/4P3/4K2k w - -"
+        )
+
+    def test_index_tolerates_layout(self, tmp_path):
+        path = tmp_path / "from-games.json"
+        path.write_text(
+            '[{"motif":"fork","fen":"8/8/8/8/8/8/4P3/4K2k w - - 0 1"}]',
+            encoding="utf-8",
+        )
+        assert _server._load_game_puzzles(path) == (
+            1, {_server._fen_key(b"8/8/8/8/8/8/4P3/4K2k w - -")},
+        )
+
+
+class TestAppendGamePuzzles:
+    """Test splicing new puzzles into from-games.json."""
+
+    @pytest.mark.parametrize("existing", [[], [{"fen": "a", "motif": "fork"}]])
+    def test_matches_full_rewrite(self, tmp_path, existing):
+        path = tmp_path / "from-games.json"
+        path.write_text(json.dumps(existing, indent=2), encoding="utf-8")
+        new = [{"fen": "b", "solution_san": ["Qxf7#"]}, {"fen": "c"}]
+
+        total = _server._append_game_puzzles(path, new, len(existing))
+
+        assert total == len(existing) + 2
+        assert path.read_text(encoding="utf-8") == json.dumps(
+            existing + new, indent=2
+        )
+
+    def test_missing_or_malformed_file_starts_fresh(self, tmp_path):
+        path = tmp_path / "from-games.json"
+        assert _server._append_game_puzzles(path, [{"fen": "a"}], 0) == 1
+        assert json.loads(path.read_text(encoding="utf-8")) == [{"fen": "a"}]
+
+        path.write_text("not json", encoding="utf-8")
+        assert _server._append_game_puzzles(path, [{"fen": "b"}], 0) == 1
+        assert json.loads(path.read_text(encoding="utf-8")) == [{"fen": "b"}]
+
+
+class TestGeneratePuzzlesRerun:
+    """Test that re-mining an unchanged game skips the engine."""
+
+    def test_identical_rerun_is_skipped(self):
+        import chess
+
+        board = chess.Board()
+        for san in ("f3", "e5", "g4", "Qh4#"):
+            board.push_san(san)
+        game = _server.GameRecord(
+            board=board, player_color="white", target_elo=800,
+            starting_fen=chess.STARTING_FEN,
+        )
+        _games["mined"] = game
+        path = _server._PROJECT_ROOT / "puzzles" / "from-games.json"
+        game.puzzles_mined = (tuple(board.move_stack), 100, _server._file_key(path))
+
+        # No engine is started: the previous run's key still matches
+        result = _server.generate_puzzles_from_game("mined")
+        assert result["puzzles_added"] == 0
+        assert result["total_game_puzzles"] == _server._load_game_puzzles(path)[0]
+        assert _server._analysis_engine is None
+
+
+class TestGeneratePuzzlesForcedMoves:
+    """Test which forced player moves are sent to the engine."""
+
+    @pytest.mark.parametrize("cp_threshold,searched", [(100, 0), (0, 1)])
+    def test_forced_move_skipped_only_for_positive_threshold(
+        self, monkeypatch, cp_threshold, searched
+    ):
+        import chess
+
+        # White's only legal move is Kh2, then Black mates
+        fen = "7k/8/8/8/q7/8/5PP1/r6K w - - 0 1"
+        board = chess.Board(fen)
+        for san in ("Kh2", "Qh4#"):
+            board.push_san(san)
+        _games["forced"] = _server.GameRecord(
+            board=board, player_color="white", target_elo=800, starting_fen=fen,
+        )
+
+        evaluated = []
+
+        def fake_evaluate(jobs):
+            evaluated.extend(jobs)
+            return []
+
+        monkeypatch.setattr(_server, "_evaluate_moves_parallel", fake_evaluate)
+
+        result = _server.generate_puzzles_from_game("forced", cp_threshold=cp_threshold)
+        assert "error" not in result
+        assert len(evaluated) == searched
+
+
 class TestExportAfterSession:
     """Test that export works with updated progress data."""
 
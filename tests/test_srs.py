@@ -279,6 +279,32 @@ class TestAddCard:
         assert len(saved) == 1
         assert saved[0]["id"] == card["id"]
 
+    def test_add_cards_saves_once(self, tmp_path):
+        """add_cards keeps input order and rewrites the file a single time."""
+        manager = _make_manager(tmp_path)
+        mistakes = [
+            {"fen": _SAMPLE_FEN, "player_move": "e5", "best_move": "d5",
+             "cp_loss": 45, "classification": "inaccuracy"},
+            {"fen": _SAMPLE_FEN, "player_move": "f6", "best_move": "d5",
+             "cp_loss": 210, "classification": "blunder", "motif": "fork"},
+        ]
+        with patch.object(manager, "_save", wraps=manager._save) as save:
+            cards = manager.add_cards(mistakes)
+        assert save.call_count == 1
+        assert [c["player_move"] for c in cards] == ["e5", "f6"]
+        assert cards[0]["motif"] is None
+        assert cards[0]["explanation"] == ""
+        assert cards[1]["motif"] == "fork"
+
+        saved = json.loads((tmp_path / "srs_cards.json").read_text(encoding="utf-8"))
+        assert [c["id"] for c in saved] == [c["id"] for c in cards]
+
+    def test_add_cards_empty_does_not_save(self, tmp_path):
+        manager = _make_manager(tmp_path)
+        with patch.object(manager, "_save") as save:
+            assert manager.add_cards([]) == []
+        save.assert_not_called()
+
 
 # ---------------------------------------------------------------------------
 # Error handling